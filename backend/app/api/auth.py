@@ -1,6 +1,9 @@
 """
 Authentication API routes
 Handles user login and JWT token generation with rate limiting
+
+处理函数为同步函数，bcrypt 校验和数据库查询在线程池中执行
+The handler is a plain `def` so bcrypt verification and DB queries run on the threadpool
 """
 from datetime import timedelta, datetime
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -12,13 +15,14 @@ from ..services.user_service import authenticate_user
 from ..core.security import create_access_token
 from ..core.config import settings
 from ..core.rate_limiter import rate_limiter
+from ..core.password_pool import PasswordPoolBusy
 from ..schemas.user import Token
 
 router = APIRouter()
 
 
 @router.post("/token", response_model=Token)
-async def login_for_access_token(
+def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
@@ -42,6 +46,7 @@ async def login_for_access_token(
     Raises:
         HTTPException: 401 if authentication fails
         HTTPException: 429 if rate limit exceeded (too many failed attempts)
+        HTTPException: 503 if the password verification queue is full
 
     Note:
         This endpoint is not protected by JWT - it's the entry point for authentication
@@ -50,8 +55,8 @@ async def login_for_access_token(
     username = form_data.username
 
     # 检查账户是否被锁定 - Check if account is locked
-    if rate_limiter.is_locked(username):
-        lockout_time = rate_limiter.get_lockout_time(username)
+    lockout_time = rate_limiter.get_lockout_time(username)
+    if lockout_time is not None:
         remaining_minutes = int((lockout_time - datetime.now()).total_seconds() / 60)
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -60,7 +65,15 @@ async def login_for_access_token(
         )
 
     # 验证用户凭据 - Authenticate user credentials
-    user = authenticate_user(db, username, form_data.password)
+    try:
+        user = authenticate_user(db, username, form_data.password)
+    except PasswordPoolBusy:
+        # 校验队列已满，快速失败 - Verification queue is full, fail fast
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress. Please try again shortly.",
+            headers={"Retry-After": "1"},
+        )
 
     if not user:
         # 记录失败尝试 - Record failed attempt
@@ -0,0 +1,82 @@
+"""
+Build status API routes
+Lets the admin panel poll background Astro builds scheduled by post changes
+All endpoints require JWT authentication
+"""
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+from ..data.models import User
+from ..core.security import get_current_user
+from ..services.build_service import build_history, build_scheduler
+from ..schemas.build import BuildStatus
+
+router = APIRouter()
+
+
+@router.get("/builds", response_model=List[BuildStatus])
+def list_builds(
+    response: Response,
+    status_filter: Optional[Literal["succeeded", "failed", "skipped"]] = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    查询构建历史 - List build history
+
+    功能说明：
+    - 返回已结束的构建记录（成功、失败、跳过），按创建时间倒序
+    - 每条记录包含触发原因、涉及的文章、排队等待、构建耗时、峰值内存、退出码和日志末尾
+    - 用于跟踪构建耗时随文章数量的变化，以及排查保存变慢的原因
+    - 需要JWT认证的受保护接口
+
+    Args:
+        status: Only builds with this outcome
+        limit: Page size
+        offset: Number of builds to skip
+
+    Returns:
+        Page of finished builds, newest first.
+        The X-Total-Count response header carries the number of matching builds
+
+    Note:
+        Queued and running builds are not listed; poll them via /builds/{build_id}
+    """
+    rows, total = build_history.list(status=status_filter, limit=limit, offset=offset)
+    response.headers["X-Total-Count"] = str(total)
+    return [BuildStatus.model_validate(row) for row in rows]
+
+
+@router.get("/builds/{build_id}", response_model=BuildStatus)
+def get_build_status(
+    build_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    查询构建状态 - Get background build status
+
+    功能说明：
+    - 文章增删改接口返回 202 和 build_id，前端可通过此接口轮询构建结果
+    - 需要JWT认证的受保护接口
+
+    Args:
+        build_id: Build identifier returned by post create/update/delete
+
+    Returns:
+        Current status of the build
+
+    Raises:
+        HTTPException: 404 if build not found
+    """
+    # 内存中没有时回退到已持久化的历史 - Fall back to persisted history once evicted from memory
+    record = build_scheduler.get(build_id) or build_history.get(build_id)
+
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Build '{build_id}' not found"
+        )
+
+    return BuildStatus.model_validate(record)
@@ -2,53 +2,216 @@
 Posts management API routes
 Handles all CRUD operations for blog articles
 All endpoints require JWT authentication
+
+处理函数均为同步函数，由 FastAPI 在线程池中执行，文件读写不会阻塞事件循环
+Handlers are plain `def` so FastAPI runs them on its threadpool and file I/O never blocks the event loop
+(the bulk import handler streams the request body itself and hands the file work to the threadpool)
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import hashlib
+import tempfile
+from datetime import date, datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from ..data.database import get_db
 from ..data.models import User
 from ..core.security import get_current_user
-from ..services import post_service
-from ..schemas.post import PostMetadata, PostCreate, PostUpdate, PostFull, PostResponse
+from ..core.http_cache import is_not_modified, not_modified_response, validator_headers
+from ..core.config import settings
+from ..services import bulk_service, post_service
+from ..services.build_service import request_rebuild
+from ..services.search_service import search_index
+from ..schemas.post import PostMetadata, PostCreate, PostUpdate, PostBatchUpdate, PostFull, PostResponse
 
 router = APIRouter()
 
 
 @router.get("/posts", response_model=List[PostMetadata])
-async def get_all_posts(
+def get_all_posts(
+    request: Request,
+    response: Response,
+    first_level_category: Optional[str] = None,
+    second_level_category: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    draft: Optional[bool] = None,
+    published_from: Optional[date] = None,
+    published_to: Optional[date] = None,
+    sort: Literal["published", "title", "slug"] = "published",
+    order: Literal["asc", "desc"] = "desc",
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    获取所有文章元数据列表 - Get all posts metadata (without content body)
+    获取文章元数据列表 - Get posts metadata (without content body)
 
     功能说明：
-    - 返回所有文章的元数据（不包含文章内容主体）
-    - 按发布日期排序，用于管理面板文章列表显示
+    - 返回文章的元数据（不包含文章内容主体）
+    - 支持按分类、标签、草稿状态和发布日期范围过滤
+    - 支持服务端排序和基于游标的分页
+    - 默认按发布日期倒序返回全部文章，用于管理面板文章列表显示
     - 需要JWT认证的受保护接口
 
+    Args:
+        first_level_category / second_level_category: Exact category match
+        tags: Repeatable; posts must carry all given tags
+        draft: Filter by draft status
+        published_from / published_to: Inclusive publication date range
+        sort: Sort field (published | title | slug)
+        order: asc | desc
+        limit: Page size; omit to get every matching post
+        cursor: X-Next-Cursor value from the previous page
+
     Returns:
-        List of all posts with metadata only, sorted by publication date
+        Page of posts metadata. Response headers carry X-Total-Count
+        (matching posts) and X-Next-Cursor (absent on the last page).
+        304 Not Modified if If-None-Match still matches
+
+    Raises:
+        HTTPException: 400 if the cursor is invalid
 
     Note:
         Protected endpoint - requires valid JWT token
-        Used for admin dashboard article list display
+        Answered from the in-memory metadata index, not a file scan
+        The ETag covers every post file's mtime/size plus the query string.
+        If-Modified-Since is ignored: no timestamp reflects deletions
     """
     try:
-        posts_metadata = post_service.get_all_posts_metadata()
-        return posts_metadata
+        cursor_key = post_service.decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    try:
+        fingerprint = post_service.get_posts_list_validators()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch posts: {str(e)}"
         )
 
+    # 文件未变化时直接返回304，不执行查询 - Answer 304 without querying when nothing changed
+    etag = '"' + hashlib.sha1(f"{fingerprint}?{request.url.query}".encode('utf-8')).hexdigest() + '"'
+    if is_not_modified(request, etag, None):
+        return not_modified_response(etag, None)
+
+    try:
+        posts_metadata, next_key, total = post_service.query_posts_metadata(
+            sync=False,
+            first_level_category=first_level_category,
+            second_level_category=second_level_category,
+            tags=tags,
+            draft=draft,
+            published_from=published_from,
+            published_to=published_to,
+            sort=sort,
+            order=order,
+            limit=limit,
+            cursor=cursor_key,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch posts: {str(e)}"
+        )
+
+    response.headers.update(validator_headers(etag, None))
+    response.headers["X-Total-Count"] = str(total)
+    if next_key is not None:
+        response.headers["X-Next-Cursor"] = post_service.encode_cursor(next_key)
+    return posts_metadata
+
+
+@router.get("/posts/search", response_model=List[PostMetadata])
+def search_posts(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    全文搜索文章 - Full-text search posts
+
+    功能说明：
+    - 搜索标题、描述、标签和正文，支持中文
+    - 包含草稿（Pagefind 只覆盖已发布的站点）
+    - 按相关度排序并分页
+    - 需要JWT认证的受保护接口
+
+    Args:
+        q: Search text
+        limit: Page size
+        offset: Number of results to skip
+
+    Returns:
+        Page of matching posts metadata, most relevant first.
+        The X-Total-Count response header carries the number of matches
+
+    Raises:
+        HTTPException: 503 if full-text search is unavailable
+
+    Note:
+        Protected endpoint - requires valid JWT token
+        Backed by an SQLite FTS5 index maintained on every create/update/delete
+    """
+    if not search_index.available:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Full-text search is not available"
+        )
+
+    try:
+        results, total = post_service.search_posts(q, limit=limit, offset=offset)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to search posts: {str(e)}"
+        )
+
+    response.headers["X-Total-Count"] = str(total)
+    return results
+
+
+@router.get("/posts/export")
+def export_posts(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    导出全部文章 - Export all posts
+
+    功能说明：
+    - 将文章目录中的所有 Markdown 文件（包括草稿）打包为 tar.gz 并分块流式返回
+    - 导出的归档可直接用于 POST /posts/bulk 导入
+    - 需要JWT认证的受保护接口
+
+    Returns:
+        Streamed application/gzip attachment
+
+    Note:
+        Protected endpoint - requires valid JWT token
+        Posts are compressed one at a time, so memory use does not grow with the number of posts
+    """
+    filename = f"posts-{datetime.now().strftime('%Y%m%d-%H%M%S')}.tar.gz"
+    return StreamingResponse(
+        bulk_service.export_archive(),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 
 @router.get("/posts/{slug}", response_model=PostFull)
-async def get_post_by_slug(
+def get_post_by_slug(
     slug: str,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -64,7 +227,8 @@ async def get_post_by_slug(
         slug: Post identifier (filename without extension)
 
     Returns:
-        Complete post data including content body
+        Complete post data including content body,
+        or 304 Not Modified if If-None-Match / If-Modified-Since still match
 
     Raises:
         HTTPException: 404 if post not found
@@ -72,8 +236,16 @@ async def get_post_by_slug(
     Note:
         Protected endpoint - requires valid JWT token
         Used for post editing interface
+        The ETag is derived from the file's mtime and size, so 304s never read the file
     """
-    post = post_service.get_post_by_slug(slug)
+    validators = post_service.get_post_validators(slug)
+    post = None
+
+    if validators:
+        etag, last_modified = validators
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        post = post_service.get_post_by_slug(slug)
 
     if not post:
         raise HTTPException(
@@ -81,11 +253,12 @@ async def get_post_by_slug(
             detail=f"Post with slug '{slug}' not found"
         )
 
+    response.headers.update(validator_headers(etag, last_modified))
     return post
 
 
-@router.post("/posts", response_model=PostResponse)
-async def create_post(
+@router.post("/posts", response_model=PostResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_post(
     post_data: PostCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -96,19 +269,29 @@ async def create_post(
     功能说明：
     - 创建新的博客文章
     - 自动生成slug标识符
-    - 创建后自动触发Astro项目重新构建
+    - 创建后在后台调度Astro项目重新构建，立即返回202和build_id
     - 需要JWT认证的受保护接口
 
     Args:
         post_data: Complete post data including content
 
     Returns:
-        Success/failure response with details
+        Success/failure response with details (data.build_id is null in development mode)
 
     Note:
         Protected endpoint - requires valid JWT token
-        Automatically triggers Astro project rebuild after creation
+        Schedules a background Astro rebuild; poll GET /builds/{build_id} for its status
+
+    Raises:
+        HTTPException: 422 if the title maps to a reserved slug
     """
+    slug = post_service._generate_slug(post_data.title)
+    if slug in post_service.RESERVED_SLUGS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"The slug '{slug}' is reserved; choose another title"
+        )
+
     try:
         # 将Pydantic模型转换为字典供服务层使用 - Convert Pydantic model to dict for service layer
         post_dict = post_data.dict()
@@ -116,10 +299,11 @@ async def create_post(
         success = post_service.create_post(post_dict)
 
         if success:
+            build = request_rebuild("create", [slug])
             return PostResponse(
                 success=True,
                 message="Post created successfully",
-                data={"slug": post_service._generate_slug(post_data.title)}
+                data={"slug": slug, "build_id": build.id if build else None}
             )
         else:
             raise HTTPException(
@@ -134,10 +318,153 @@ async def create_post(
         )
 
 
-@router.put("/posts/{slug}", response_model=PostResponse)
-async def update_post(
+@router.post("/posts/bulk", response_model=PostResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_posts(
+    request: Request,
+    overwrite: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    批量导入文章 - Bulk import posts
+
+    功能说明：
+    - 请求体为 tar/tar.gz/zip 归档（每个 .md 文件一篇文章，文件名即slug）
+      或 application/x-ndjson（每行一个 PostCreate 对象，可带 slug 字段）
+    - 所有文章先通过 PostCreate 校验，任一失败则整批拒绝，不写入任何文件
+    - 每篇文章原子写入，写入失败时整批回滚
+    - 整批只调度一次 Astro 重建
+    - 需要JWT认证的受保护接口
+
+    Args:
+        overwrite: Replace posts whose slug already exists (default: reject the batch)
+
+    Returns:
+        Success response with the imported slugs and the build_id
+
+    Raises:
+        HTTPException: 413 if the body exceeds BULK_IMPORT_MAX_BYTES,
+            422 if the payload is unreadable or any post is invalid,
+            409 if a slug exists and overwrite is false
+
+    Note:
+        Protected endpoint - requires valid JWT token
+        The body is spooled to a temporary file, then parsed and written on the threadpool
+    """
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as body:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.BULK_IMPORT_MAX_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Upload exceeds {settings.BULK_IMPORT_MAX_BYTES} bytes"
+                )
+            body.write(chunk)
+        body.seek(0)
+
+        try:
+            posts = await run_in_threadpool(
+                bulk_service.parse_import, body, request.headers.get("content-type", "")
+            )
+        except bulk_service.BulkImportError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail={"message": str(e), "errors": e.errors}
+            )
+
+    try:
+        slugs = await run_in_threadpool(post_service.import_posts, posts, overwrite)
+    except FileExistsError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import posts: {str(e)}"
+        )
+
+    build = request_rebuild("import", slugs)
+    return PostResponse(
+        success=True,
+        message=f"Imported {len(slugs)} posts",
+        data={"slugs": slugs, "count": len(slugs), "build_id": build.id if build else None}
+    )
+
+
+@router.patch("/posts", response_model=PostResponse, status_code=status.HTTP_202_ACCEPTED)
+def batch_update_posts(
+    batch: PostBatchUpdate,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    批量更新文章 - Batch update posts
+
+    功能说明：
+    - 依次对多篇文章应用部分更新（如批量修改标签或二级分类）
+    - 每项独立执行，返回逐项结果；单项失败不影响其他项
+    - 整批完成后只调度一次 Astro 重建
+    - 没有任何文章发生变化时不重建，返回200
+    - 需要JWT认证的受保护接口
+
+    Args:
+        batch: List of operations, each a slug plus the fields to change
+
+    Returns:
+        data.results: Per-item {slug, success, changed, error}
+        data.build_id: The single rebuild for the batch (null if nothing changed or in development mode)
+
+    Note:
+        Protected endpoint - requires valid JWT token
+    """
+    results = []
+    changed_slugs = []
+
+    for operation in batch.operations:
+        changes = operation.dict(exclude_unset=True)
+        slug = changes.pop("slug")
+        item = {"slug": slug, "success": False, "changed": False, "error": None}
+        results.append(item)
+
+        if not changes:
+            item["error"] = "No fields provided for update"
+            continue
+
+        try:
+            result = post_service.patch_post(slug, changes)
+        except Exception as e:
+            item["error"] = f"Failed to update post: {str(e)}"
+            continue
+
+        if result is None:
+            item["error"] = f"Post with slug '{slug}' not found"
+        elif not result.success:
+            item["error"] = "Failed to update post"
+        else:
+            item["success"] = True
+            item["changed"] = result.changed
+            if result.changed:
+                changed_slugs.append(slug)
+
+    build = request_rebuild("batch-update", changed_slugs) if changed_slugs else None
+    if not changed_slugs:
+        response.status_code = status.HTTP_200_OK
+
+    succeeded = sum(1 for item in results if item["success"])
+    return PostResponse(
+        success=succeeded == len(results),
+        message=f"Updated {succeeded} of {len(results)} posts ({len(changed_slugs)} changed)",
+        data={"results": results, "build_id": build.id if build else None}
+    )
+
+
+@router.put("/posts/{slug}", response_model=PostResponse, status_code=status.HTTP_202_ACCEPTED)
+def update_post(
     slug: str,
     post_data: PostUpdate,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -146,7 +473,8 @@ async def update_post(
 
     功能说明：
     - 更新指定文章的内容（支持部分更新）
-    - 更新后自动触发Astro项目重新构建
+    - 更新后在后台调度Astro项目重新构建，立即返回202和build_id
+    - 内容与磁盘文件完全相同时不写入、不重建，返回200且 data.changed 为 false
     - 需要JWT认证的受保护接口
 
     Args:
@@ -154,24 +482,17 @@ async def update_post(
         post_data: Updated post data (partial updates allowed)
 
     Returns:
-        Success/failure response with details
+        Success/failure response with details; data.changed reports whether the file changed
 
     Raises:
         HTTPException: 404 if post not found
 
     Note:
         Protected endpoint - requires valid JWT token
-        Automatically triggers Astro project rebuild after update
+        Schedules a background Astro rebuild; poll GET /builds/{build_id} for its status
+        Identical payloads (e.g. editor autosave) skip both the write and the rebuild
     """
     try:
-        # Check if post exists
-        existing_post = post_service.get_post_by_slug(slug)
-        if not existing_post:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Post with slug '{slug}' not found"
-            )
-
         # Convert Pydantic model to dict, excluding None values for partial updates
         post_dict = post_data.dict(exclude_unset=True)
 
@@ -182,16 +503,29 @@ async def update_post(
                 detail="No fields provided for update"
             )
 
-        # Merge with existing data for partial updates
-        updated_data = {**existing_post, **post_dict}
+        # Merge with existing data for partial updates (under the slug lock)
+        result = post_service.patch_post(slug, post_dict)
+        if result is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Post with slug '{slug}' not found"
+            )
 
-        success = post_service.update_post(slug, updated_data)
+        if result.success and not result.changed:
+            # 内容未变化：不写文件、不重建 - Nothing changed: no write, no rebuild
+            response.status_code = status.HTTP_200_OK
+            return PostResponse(
+                success=True,
+                message="Post unchanged",
+                data={"slug": slug, "changed": False, "build_id": None}
+            )
 
-        if success:
+        if result.success:
+            build = request_rebuild("update", [slug])
             return PostResponse(
                 success=True,
                 message="Post updated successfully",
-                data={"slug": slug}
+                data={"slug": slug, "changed": True, "build_id": build.id if build else None}
             )
         else:
             raise HTTPException(
@@ -208,8 +542,8 @@ async def update_post(
         )
 
 
-@router.delete("/posts/{slug}", response_model=PostResponse)
-async def delete_post(
+@router.delete("/posts/{slug}", response_model=PostResponse, status_code=status.HTTP_202_ACCEPTED)
+def delete_post(
     slug: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -219,7 +553,7 @@ async def delete_post(
 
     功能说明：
     - 删除指定的文章文件
-    - 删除后自动触发Astro项目重新构建
+    - 删除后在后台调度Astro项目重新构建，立即返回202和build_id
     - 该操作不可逆转，请谨慎操作
     - 需要JWT认证的受保护接口
 
@@ -234,7 +568,7 @@ async def delete_post(
 
     Note:
         Protected endpoint - requires valid JWT token
-        Automatically triggers Astro project rebuild after deletion
+        Schedules a background Astro rebuild; poll GET /builds/{build_id} for its status
         This operation is irreversible
     """
     try:
@@ -249,10 +583,11 @@ async def delete_post(
         success = post_service.delete_post(slug)
 
         if success:
+            build = request_rebuild("delete", [slug])
             return PostResponse(
                 success=True,
                 message="Post deleted successfully",
-                data={"slug": slug}
+                data={"slug": slug, "build_id": build.id if build else None}
             )
         else:
             raise HTTPException(
@@ -23,19 +23,100 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 1  # 1天
 
+    # 已验证令牌缓存：最大条目数和存活时间（秒），不会超过令牌本身的过期时间
+    # Verified token cache: max entries and lifetime in seconds, never past the token's own expiry
+    TOKEN_CACHE_SIZE: int = 256
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+
     # Database Configuration
     DATABASE_URL: str = "sqlite:///./data/dataBase.db"
 
+    # SQLite 调优参数：WAL 允许读写并发，NORMAL 在 WAL 下足够安全
+    # busy_timeout 让并发写入等待而不是立即报 "database is locked"
+    # cache_size 为负数时单位为 KiB
+    # SQLite tuning profile: WAL lets readers and the writer run concurrently, NORMAL is safe under WAL
+    # busy_timeout makes concurrent writers wait instead of failing with "database is locked"
+    # A negative cache_size is in KiB
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE: int = -8000  # 8 MiB
+    SQLITE_MMAP_SIZE: int = 64 * 1024 * 1024  # 64 MiB
+
+    # 连接池：每个使用数据库的线程最多占用一个连接；请求会话持有连接直到请求结束，
+    # 所以 DB_POOL_SIZE 默认等于 THREADPOOL_SIZE，溢出连接留给构建、监听等后台线程
+    # Connection pool: each thread touching the database holds at most one connection, and a request's
+    # session keeps it until the request ends, so DB_POOL_SIZE defaults to THREADPOOL_SIZE;
+    # the overflow covers background threads (build worker, posts watcher)
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: int = 8
+
     # Astro Project Configuration - Paths in Docker Containers
     ASTRO_CONTENT_PATH: str = "/code/lingLong/src/contents/posts"
     ASTRO_PROJECT_PATH: str = "/code/lingLong"
 
+    # 文章写入后是否 fsync（文件和目录），关闭可减少SD卡写入延迟，但断电时可能丢失最近的保存
+    # fsync post files (and their directory) after writing; disabling lowers SD-card latency
+    # but recent saves may be lost on power failure
+    POST_FSYNC: bool = True
+
+    # 批量导入的请求体大小上限（字节），同时限制归档解压后的总大小
+    # Bulk import body size limit in bytes; also caps the decompressed size of archives
+    BULK_IMPORT_MAX_BYTES: int = 50 * 1024 * 1024
+
+    # 登录失败限流：失败记录的有效窗口（分钟）和最多跟踪的用户名数量
+    # Login rate limiting: how long failures count (minutes) and how many usernames are tracked at most
+    LOGIN_FAILURE_WINDOW_MINUTES: int = 15
+    LOGIN_RATE_LIMIT_MAX_ENTRIES: int = 10000
+    # 限流后端：sqlite（多 worker 共享、重启保留）| memory（单进程）
+    # Rate limiter backend: sqlite (shared across workers, survives restarts) | memory (single process)
+    LOGIN_RATE_LIMIT_BACKEND: str = "sqlite"
+
+    # Astro 重建防抖配置：静默窗口内的多次文章变更只触发一次构建
+    # Astro rebuild debounce: post changes within the quiet window trigger a single build
+    BUILD_DEBOUNCE_SECONDS: float = 5.0
+
+    # 构建清单：记录上次成功构建时的文章哈希和之后变更的slug，内容未变时跳过构建
+    # Build manifest: post hashes at the last successful build plus slugs changed since;
+    # builds are skipped when nothing actually changed
+    BUILD_MANIFEST_PATH: str = "./data/build_manifest.json"
+
+    # 构建历史：保留的记录数，以及每条记录保存的构建输出末尾字节数
+    # Build history: rows kept, and how many trailing bytes of build output each row stores
+    BUILD_HISTORY_LIMIT: int = 1000
+    BUILD_LOG_TAIL_BYTES: int = 8192
+
+    # 文章目录监听配置：auto | inotify | poll | off
+    # Posts directory watcher: auto | inotify | poll | off
+    POST_WATCHER_MODE: str = "auto"
+    POST_WATCHER_POLL_INTERVAL: float = 2.0
+
+    # 全局请求限流：按路由类别的令牌桶预算，格式为 类别=突发量/每分钟补充量
+    # auth: POST /token；bulk: 批量导入导出；read/write: 管理接口的读/写；default: 其他
+    # API-wide throttling: token bucket budget per route class as class=burst/per_minute
+    # auth: POST /token; bulk: bulk import/export; read/write: admin reads/writes; default: everything else
+    THROTTLE_ENABLED: bool = True
+    THROTTLE_BUDGETS: str = "auth=10/10,bulk=3/6,read=120/1200,write=30/120,default=60/600"
+    THROTTLE_MAX_CLIENTS: int = 10000
+    # 受信任的反向代理网段（逗号分隔），只有来自这些地址的 X-Forwarded-For 才会被采用
+    # Trusted reverse proxy networks (comma separated); X-Forwarded-For is honoured only from these peers
+    THROTTLE_TRUSTED_PROXIES: str = "127.0.0.1/32,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16"
+
     # API config
     API_PREFIX: str = "/api"
     PROJECT_NAME: str = "Blog Backend API"
     VERSION: str = "1.0.0"
     DESCRIPTION: str = "博客管理后端API"
 
+    # 线程池大小：同步路由（文件读写、数据库、bcrypt）在此线程池中执行
+    # Threadpool size: sync routes (file I/O, database, bcrypt) run on this pool
+    THREADPOOL_SIZE: int = 40
+
+    # bcrypt 密码校验进程池：工作进程数和最大排队数，超出时登录接口直接返回 503
+    # bcrypt verification pool: worker processes and max queued checks; beyond that /token answers 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 8
+
     # environment config
     ENVIRONMENT: str = "production"  # development | production
 
@@ -69,29 +150,34 @@ settings = Settings()
 # Handling ALLOWED_ORIGINS Configuration
 def get_allowed_origins() -> list[str]:
     """
-    获取允许的跨域来源列表
+    获取允许的跨域来源规则列表
 
-    开发环境：使用本地端口范围
-    生产环境：从 .env 读取域名列表（逗号分隔）
+    开发环境：使用本地端口范围规则
+    生产环境：从 .env 读取来源规则（逗号分隔），支持端口范围和通配子域名
+    规则由 core.cors.OriginPolicy 编译，不再展开为逐个端口的来源列表
 
-    Get the list of allowed cross-origin origins
-    Development environment: Use the local port range
-    Production environment: Read a comma-delimited list of domains from .env
+    Get the list of allowed cross-origin origin rules
+    Development environment: Use local port range rules
+    Production environment: Read comma-delimited rules from .env;
+    port ranges (http://host:4321-5000) and wildcard subdomains (https://*.example.com) are supported
+    Rules are compiled by core.cors.OriginPolicy instead of being expanded port by port
     """
     if settings.ALLOWED_ORIGINS:
-        # 从环境变量读取，支持逗号分隔的多个域名
-        # Read from environment variables, support comma-separated multiple domain names
-        return [origin.strip() for origin in settings.ALLOWED_ORIGINS.split(",")]
+        # 从环境变量读取，支持逗号分隔的多个规则
+        # Read from environment variables, support comma-separated multiple rules
+        return [origin.strip() for origin in settings.ALLOWED_ORIGINS.split(",") if origin.strip()]
 
     # 默认开发环境配置
     # Default development environment configuration
-    return (
-        ["http://localhost:3000", "http://127.0.0.1:3000"] +
+    port_range = f"{settings.LOCAL_PORT_RANGE_START}-{settings.LOCAL_PORT_RANGE_END}"
+    return [
+        "http://localhost:3000",
+        "http://127.0.0.1:3000",
         # 开发端口范围
         # Development port range
-        [f"http://localhost:{port}" for port in range(settings.LOCAL_PORT_RANGE_START, settings.LOCAL_PORT_RANGE_END + 1)] +
-        [f"http://127.0.0.1:{port}" for port in range(settings.LOCAL_PORT_RANGE_START, settings.LOCAL_PORT_RANGE_END + 1)]
-    )
+        f"http://localhost:{port_range}",
+        f"http://127.0.0.1:{port_range}",
+    ]
 
 # 全局 CORS 配置
 # Global CORS Configuration
@@ -0,0 +1,134 @@
+"""
+CORS 来源匹配策略
+将允许的来源编译为集合/字典索引，支持通配子域名和端口范围，匹配代价与规则数量无关
+CORS origin matching policy
+Compiles allowed origins into set/dict indexes with wildcard subdomains and port ranges,
+so matching cost does not grow with the number of rules
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _split_origin(origin: str) -> Optional[Tuple[str, str, str]]:
+    """Split "scheme://host[:port]" into (scheme, host, port text); None if malformed"""
+    scheme, sep, rest = origin.partition("://")
+    if not sep or not rest or "/" in rest:
+        return None
+    scheme = scheme.lower()
+
+    if rest.startswith("["):
+        # IPv6 字面量--IPv6 literal, e.g. [::1]:8080
+        host, bracket, port = rest.partition("]")
+        if not bracket or (port and not port.startswith(":")):
+            return None
+        return scheme, (host + "]").lower(), port[1:]
+
+    host, _, port = rest.partition(":")
+    return scheme, host.lower(), port
+
+
+class OriginPolicy:
+    """
+    已编译的来源允许策略 - Compiled allowed-origin policy
+
+    Rule syntax (one per entry):
+    - "https://example.com"            exact origin (default port implied)
+    - "http://localhost:4321-5000"     inclusive port range
+    - "https://*.example.com"          any subdomain of example.com (not the apex)
+    - "*"                              every origin
+
+    Rules:
+    - Exact origins are looked up in a set (verbatim first, then normalized)
+    - Port ranges and wildcards are looked up by (scheme, host) / (scheme, parent domain),
+      so a check costs O(number of labels in the host), independent of the rule count
+    """
+
+    def __init__(self, rules: Iterable[str]):
+        self.allow_all = False
+        self._literal: Set[str] = set()
+        self._exact: Set[Tuple[str, str, int]] = set()
+        self._ranges: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
+        self._wildcards: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
+
+        for rule in rules:
+            rule = rule.strip()
+            if not rule:
+                continue
+            if rule == "*":
+                self.allow_all = True
+                continue
+            self._add_rule(rule)
+
+    def _add_rule(self, rule: str) -> None:
+        parts = _split_origin(rule)
+        if parts is None:
+            raise ValueError(f"Invalid CORS origin rule: {rule}")
+        scheme, host, port_text = parts
+
+        if not port_text:
+            start = end = DEFAULT_PORTS.get(scheme, 0)
+        elif "-" in port_text:
+            low, _, high = port_text.partition("-")
+            start, end = int(low), int(high)
+        else:
+            start = end = int(port_text)
+
+        if host.startswith("*."):
+            self._wildcards.setdefault((scheme, host[1:]), []).append((start, end))
+        elif start == end:
+            self._exact.add((scheme, host, start))
+            self._literal.add(rule)
+        else:
+            self._ranges.setdefault((scheme, host), []).append((start, end))
+
+    def is_allowed(self, origin: str) -> bool:
+        """Check whether an Origin header value is allowed"""
+        if self.allow_all or origin in self._literal:
+            return True
+
+        parts = _split_origin(origin)
+        if parts is None:
+            return False
+        scheme, host, port_text = parts
+        if port_text:
+            if not port_text.isdigit():
+                return False
+            port = int(port_text)
+        else:
+            port = DEFAULT_PORTS.get(scheme, 0)
+
+        if (scheme, host, port) in self._exact:
+            return True
+
+        for start, end in self._ranges.get((scheme, host), ()):
+            if start <= port <= end:
+                return True
+
+        if self._wildcards:
+            # 逐级检查父域名--Check each parent domain: a.b.example.com -> .b.example.com, .example.com, .com
+            dot = host.find(".")
+            while dot != -1:
+                for start, end in self._wildcards.get((scheme, host[dot:]), ()):
+                    if start <= port <= end:
+                        return True
+                dot = host.find(".", dot + 1)
+
+        return False
+
+
+class PolicyCORSMiddleware(CORSMiddleware):
+    """
+    使用 OriginPolicy 匹配来源的 CORS 中间件
+    CORS middleware that matches origins with an OriginPolicy instead of a list scan
+    """
+
+    def __init__(self, app: ASGIApp, origin_policy: OriginPolicy, **kwargs):
+        super().__init__(app, allow_origins=["*"] if origin_policy.allow_all else (), **kwargs)
+        self.origin_policy = origin_policy
+
+    def is_allowed_origin(self, origin: str) -> bool:
+        return self.origin_policy.is_allowed(origin)
@@ -0,0 +1,60 @@
+"""
+HTTP 条件请求工具
+处理 ETag / Last-Modified 校验，满足条件时返回 304，避免重复解析和传输
+HTTP conditional request helpers
+Handle ETag / Last-Modified validation so unchanged resources are answered with 304
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+
+
+def validator_headers(etag: str, last_modified: Optional[float]) -> Dict[str, str]:
+    """
+    构建缓存校验响应头--Build cache validator response headers
+
+    no-cache 让浏览器每次都带条件请求重新验证，而不是按启发式规则直接使用本地缓存
+    no-cache makes browsers revalidate every time instead of heuristically reusing a stale copy
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            datetime.fromtimestamp(int(last_modified), tz=timezone.utc), usegmt=True
+        )
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[float]) -> bool:
+    """
+    判断客户端缓存是否仍然有效--Check whether the client's cached copy is still valid
+
+    If-None-Match 优先；只有在没有 If-None-Match 时才使用 If-Modified-Since
+    If-None-Match takes precedence; If-Modified-Since is only used without it
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        # GET 使用弱比较，忽略 W/ 前缀--GET uses weak comparison, ignoring the W/ prefix
+        return "*" in candidates or etag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return int(last_modified) <= since.timestamp()
+
+    return False
+
+
+def not_modified_response(etag: str, last_modified: Optional[float]) -> Response:
+    """构建 304 响应--Build a 304 Not Modified response"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=validator_headers(etag, last_modified),
+    )
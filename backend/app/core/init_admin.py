@@ -7,7 +7,7 @@ Automatically create or update admin account on application startup
 from sqlalchemy.orm import Session
 from ..data.models import User
 from ..data.database import SessionLocal
-from .security import get_password_hash
+from .security import get_password_hash, pwd_context, token_cache
 from .config import settings
 import logging
 
@@ -18,11 +18,11 @@ def init_admin_user() -> None:
     """
     初始化管理员用户
     - 如果管理员不存在，则创建
-    - 如果存在但密码已更改，则更新密码
+    - 如果存在但密码已更改（或哈希参数已过时），则更新密码
     
     Initialize admin user
     - Create if admin doesn't exist
-    - Update password if exists and password changed
+    - Update password if exists and password changed (or the hash needs an upgrade)
     """
     if not settings.ADMIN_PASSWORD:
         logger.warning(
@@ -48,14 +48,28 @@ def init_admin_user() -> None:
             logger.info(f"✅ Admin user '{settings.ADMIN_USERNAME}' created successfully")
         else:
             # 更新现有管理员密码（如果 .env 中的密码已更改）
+            # 盐值每次不同，重新哈希后比较永远不相等，因此用校验代替比较
+            # Update the existing admin password if it changed in .env
+            # Salts differ on every hash, so verify against the stored hash instead of comparing hashes
+            # 启动时直接在当前线程校验，不为一次校验启动进程池 - Verify inline; don't spawn the process pool for one check at boot
             logger.info(f"Admin user '{settings.ADMIN_USERNAME}' already exists")
-            new_hashed_password = get_password_hash(settings.ADMIN_PASSWORD)
-            
-            # 只有密码哈希不同时才更新
-            if admin_user.hashed_password != new_hashed_password:
-                admin_user.hashed_password = new_hashed_password
+            try:
+                password_matches = pwd_context.verify(settings.ADMIN_PASSWORD, admin_user.hashed_password)
+            except ValueError:
+                # 存储的哈希无法识别 - Stored hash could not be identified
+                password_matches = False
+
+            if not password_matches:
+                admin_user.hashed_password = get_password_hash(settings.ADMIN_PASSWORD)
                 db.commit()
+                # 密码已更改，清空令牌缓存 - Password changed, drop cached tokens
+                token_cache.clear()
                 logger.info(f"✅ Admin user '{settings.ADMIN_USERNAME}' password updated")
+            elif pwd_context.needs_update(admin_user.hashed_password):
+                # 密码未变但哈希参数已过时 - Same password, outdated hash parameters
+                admin_user.hashed_password = get_password_hash(settings.ADMIN_PASSWORD)
+                db.commit()
+                logger.info(f"✅ Admin user '{settings.ADMIN_USERNAME}' password hash upgraded")
             else:
                 logger.info(f"✅ Admin user '{settings.ADMIN_USERNAME}' password unchanged")
 
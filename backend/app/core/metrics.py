@@ -0,0 +1,329 @@
+"""
+运行指标模块 - Runtime metrics
+轻量的 Prometheus 文本格式指标：计数器、仪表和直方图
+Lightweight metrics exposed in the Prometheus text format: counters, gauges and histograms
+
+记录指标只是加锁后更新几个数字；仪表值可以注册为回调，在抓取时才计算
+Recording a sample only updates a few numbers under a lock; gauges can be callbacks evaluated at scrape time,
+so nothing is computed unless /metrics is actually scraped
+"""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Prometheus 文本格式的内容类型 - Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 默认直方图桶（秒），覆盖毫秒级请求到数分钟的构建 - Default buckets (seconds): from millisecond requests to multi-minute builds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry
+REGISTRY = MetricsRegistry()
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[MetricsRegistry] = REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+GaugeCallback = Callable[[], Union[float, Dict[LabelValues, float]]]
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down
+
+    Either set directly, or computed at scrape time by callbacks that return
+    a number (no labels) or a {label values tuple: number} mapping.
+    Several callbacks can feed one gauge; each is registered under a source name.
+    """
+    type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: Dict[str, GaugeCallback] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: GaugeCallback, source: str = "default") -> None:
+        """Compute (part of) the gauge at scrape time; replaces the previous callback of the same source"""
+        with self._lock:
+            self._functions[source] = function
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+            functions = list(self._functions.values())
+
+        for function in functions:
+            try:
+                result = function()
+            except Exception as e:
+                print(f"Error collecting metric {self.name}: {e}")
+                continue
+            values.extend(result.items() if isinstance(result, dict) else [((), result)])
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # 每个标签组合：各桶计数（非累计，最后一个为 +Inf）、总和、次数 - Per label set: bucket counts (+Inf last), sum, count
+        self._values: Dict[LabelValues, List] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str):
+        """Observe the duration of a with-block in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(state[0]), state[1], state[2]) for key, state in self._values.items()]
+
+        lines = []
+        for key, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+# ---------------------------------------------------------------------------
+# 应用指标 - Application metrics
+# ---------------------------------------------------------------------------
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+
+posts_scan_duration = Histogram(
+    "posts_scan_duration_seconds",
+    "Time to reconcile the post metadata index with the posts directory",
+)
+posts_scan_files = Gauge(
+    "posts_scan_files",
+    "Markdown files in the post metadata index",
+)
+posts_reparsed = Counter(
+    "posts_reparsed_total",
+    "Markdown files re-parsed because their mtime or size changed",
+)
+frontmatter_parse_duration = Histogram(
+    "frontmatter_parse_duration_seconds",
+    "Time to parse the frontmatter of one post",
+)
+
+password_verify_duration = Histogram(
+    "password_verify_duration_seconds",
+    "bcrypt password verification time, including the wait for a pool worker",
+)
+password_pool_queue_depth = Gauge(
+    "password_pool_queue_depth",
+    "Password verifications waiting for a free pool worker",
+)
+password_pool_inflight = Gauge(
+    "password_pool_inflight",
+    "Password verifications running or queued in the pool",
+)
+password_pool_rejected = Counter(
+    "password_pool_rejected_total",
+    "Password verifications rejected because the pool queue was full",
+)
+
+build_queue_depth = Gauge(
+    "build_queue_depth",
+    "Astro builds queued or running",
+    ("status",),
+)
+build_duration = Histogram(
+    "build_duration_seconds",
+    "Wall time of Astro builds",
+    buckets=(1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0, 180.0, 240.0, 300.0),
+)
+builds = Counter(
+    "builds_total",
+    "Finished Astro builds by outcome",
+    ("outcome",),
+)
+
+rate_limiter_entries = Gauge(
+    "rate_limiter_entries",
+    "Tracked clients per rate limiter",
+    ("limiter",),
+)
+
+
+def _route_template(scope: Scope) -> str:
+    """
+    Route template of a handled request, or "unmatched"
+
+    Older FastAPI copies routes with the router prefix baked into `route.path`;
+    newer releases keep the original route and record the include prefix in scope["fastapi"]
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return "unmatched"
+    fastapi_scope = scope.get("fastapi")
+    included = fastapi_scope.get("included_router") if isinstance(fastapi_scope, dict) else None
+    prefix = getattr(getattr(included, "include_context", None), "prefix", "") or ""
+    return prefix + path
+
+
+class MetricsMiddleware:
+    """
+    请求延迟指标中间件 - Request latency metrics middleware
+
+    按路由模板（如 /api/admin/posts/{slug}）而不是原始路径记录，避免标签数量无限增长
+    Labels use the route template (e.g. /api/admin/posts/{slug}) rather than the raw path,
+    so label cardinality stays bounded; unmatched requests are recorded as "unmatched"
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=_route_template(scope),
+                status=str(status_code),
+            )
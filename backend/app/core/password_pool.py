@@ -0,0 +1,115 @@
+"""
+bcrypt 密码校验进程池
+在独立的有界进程池中执行 bcrypt，队列已满时快速失败，避免登录洪峰拖垮文章接口
+bcrypt password verification pool
+Runs bcrypt in a dedicated bounded process pool and fails fast when the queue is full,
+so a burst of logins cannot starve the rest of the API
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from passlib.context import CryptContext
+
+from . import metrics
+
+# 子进程中使用的密码上下文（与 security.pwd_context 配置相同）
+# Password context used inside worker processes (same configuration as security.pwd_context)
+_pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    """在工作进程中校验密码--Verify a password inside a worker process"""
+    return _pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the verification queue is full"""
+
+
+class PasswordPool:
+    """
+    有界 bcrypt 校验进程池 - Bounded bcrypt verification process pool
+
+    Rules:
+    - At most `workers` verifications run at once, each in its own process
+    - At most `queue_limit` more wait for a free worker
+    - Anything beyond that is rejected immediately with PasswordPoolBusy
+    - workers=0 verifies inline in the calling thread (no pool)
+    - If a worker dies (e.g. OOM-killed), the broken pool is replaced and the verification retried once
+    """
+
+    def __init__(self, workers: int = 2, queue_limit: int = 8):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        校验密码，阻塞直到结果返回--Verify a password, blocking until the result is ready
+
+        Raises:
+            PasswordPoolBusy: If `workers + queue_limit` verifications are already in flight
+        """
+        if self.workers <= 0:
+            return _verify(plain_password, hashed_password)
+
+        with self._lock:
+            if self.in_flight >= self.workers + self.queue_limit:
+                self.rejected += 1
+                metrics.password_pool_rejected.inc()
+                raise PasswordPoolBusy("Too many concurrent password verifications")
+            self.in_flight += 1
+            executor = self._get_executor()
+
+        try:
+            try:
+                return executor.submit(_verify, plain_password, hashed_password).result()
+            except BrokenProcessPool:
+                # 工作进程被杀死后进程池不可再用，重建后重试一次 - A dead worker breaks the pool for good; rebuild and retry once
+                executor = self._replace_executor(executor)
+                return executor.submit(_verify, plain_password, hashed_password).result()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Current executor, created on first use (caller holds the lock)"""
+        if self._executor is None:
+            # spawn 避免在多线程进程中 fork--spawn avoids forking a multi-threaded process
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _replace_executor(self, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """Swap out a broken executor; concurrent callers that saw the same one share the replacement"""
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+                broken.shutdown(wait=False, cancel_futures=True)
+            return self._get_executor()
+
+    def stats(self) -> Dict[str, int]:
+        """Queue depth and rejection counters"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - self.workers),
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -1,13 +1,34 @@
 """
 Rate Limiter for Login Attempts
 Prevents brute force attacks by limiting failed login attempts
+
+两种后端 - Two backends:
+- memory: 进程内存，最快，但每个 worker 各自计数，重启后清空
+  In-process memory; fastest, but counted per worker and wiped on restart
+- sqlite: 存放在 DATABASE_URL 数据库中，原子 upsert，多个 worker 和重启之间共享
+  Stored in the DATABASE_URL database with atomic upserts; shared across workers and restarts
 """
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Optional
 from dataclasses import dataclass
 
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from . import metrics
+from .config import settings
+
+# 超过该长度的用户名以哈希存储，保证每条记录大小固定
+# Usernames longer than this are stored hashed so every entry has a bounded size
+MAX_KEY_LENGTH = 128
 
-@dataclass
+
+@dataclass(slots=True)
 class LoginAttempt:
     """Record of login attempts for a user"""
     failed_count: int
@@ -15,86 +36,340 @@ class LoginAttempt:
     last_attempt: datetime
 
 
-class RateLimiter:
+def _key(username: str) -> str:
+    """Username as stored by the limiters (hashed when overlong)"""
+    if len(username) <= MAX_KEY_LENGTH:
+        return username
+    return "sha256:" + hashlib.sha256(username.encode("utf-8")).hexdigest()
+
+
+class BaseRateLimiter(ABC):
     """
-    Simple in-memory rate limiter for login attempts
+    登录限流器接口 - Login rate limiter interface
 
-    Rules:
-    - 5 failed attempts within any time period
-    - Account locked for 30 minutes after 5 failures
+    Rules shared by every backend:
+    - `max_attempts` failed attempts within the failure window lock the account
+    - The lock lasts `lockout_duration`; failures during the lock are ignored
     - Successful login resets the counter
+    - Failures older than the failure window are forgotten
     """
 
     def __init__(
         self,
         max_attempts: int = 5,
-        lockout_duration_minutes: int = 30
+        lockout_duration_minutes: int = 30,
+        failure_window_minutes: int = 15
     ):
         self.max_attempts = max_attempts
         self.lockout_duration = timedelta(minutes=lockout_duration_minutes)
-        self.attempts: Dict[str, LoginAttempt] = {}
+        self.failure_window = timedelta(minutes=failure_window_minutes)
 
     def is_locked(self, username: str) -> bool:
         """Check if account is currently locked"""
-        if username not in self.attempts:
-            return False
+        return self.get_lockout_time(username) is not None
+
+    def record_successful_login(self, username: str) -> None:
+        """Record successful login and reset counter"""
+        self.reset(username)
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of usernames currently tracked"""
 
-        attempt = self.attempts[username]
+    @abstractmethod
+    def get_lockout_time(self, username: str) -> Optional[datetime]:
+        """Get the time when account will be unlocked, or None if it is not locked"""
 
-        # Check if locked and lock period has expired
-        if attempt.locked_until:
-            if datetime.now() < attempt.locked_until:
-                return True
+    @abstractmethod
+    def record_failed_attempt(self, username: str) -> None:
+        """Record a failed login attempt"""
+
+    @abstractmethod
+    def reset(self, username: str) -> None:
+        """Reset login attempts for a user"""
+
+    @abstractmethod
+    def get_remaining_attempts(self, username: str) -> int:
+        """Get number of remaining login attempts"""
+
+
+class RateLimiter(BaseRateLimiter):
+    """
+    Simple in-memory rate limiter for login attempts
+
+    Rules:
+    - 5 failed attempts within the failure window
+    - Account locked for 30 minutes after 5 failures
+    - Successful login resets the counter
+    - Failures older than the failure window are forgotten, even if the account never locked
+    - At most `max_entries` usernames are tracked; the least recently failed
+      unlocked entry is evicted first, locked entries only when nothing else is left
+
+    内存上限固定：用户名喷洒攻击只会替换最旧的记录，而不会让字典无限增长
+    Memory is bounded: a username-spraying script only replaces the oldest records
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        lockout_duration_minutes: int = 30,
+        failure_window_minutes: int = 15,
+        max_entries: int = 10000
+    ):
+        super().__init__(max_attempts, lockout_duration_minutes, failure_window_minutes)
+        self.max_entries = max_entries
+        # 两个表都按时间排序，过期记录总在表头，清理时只需从表头弹出
+        # Both maps are time-ordered, so expired records are always at the front and sweeping pops from there
+        self.attempts: "OrderedDict[str, LoginAttempt]" = OrderedDict()  # ordered by last failure
+        self.locked: "OrderedDict[str, LoginAttempt]" = OrderedDict()  # ordered by lock expiry
+        self._lock = threading.Lock()
+
+    def _sweep(self, now: datetime) -> None:
+        """Drop expired records from the front of both maps (caller holds the lock)"""
+        while self.attempts:
+            key, attempt = next(iter(self.attempts.items()))
+            if now - attempt.last_attempt < self.failure_window:
+                break
+            del self.attempts[key]
+        while self.locked:
+            key, attempt = next(iter(self.locked.items()))
+            if now < attempt.locked_until:
+                break
+            del self.locked[key]
+
+    def _evict(self) -> None:
+        """Keep at most max_entries records (caller holds the lock)"""
+        while len(self.attempts) + len(self.locked) > self.max_entries:
+            if self.attempts:
+                self.attempts.popitem(last=False)
             else:
-                # Lock period expired, reset
-                self.reset(username)
-                return False
+                self.locked.popitem(last=False)
 
-        return False
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.attempts) + len(self.locked)
 
     def get_lockout_time(self, username: str) -> Optional[datetime]:
-        """Get the time when account will be unlocked"""
-        if username in self.attempts:
-            return self.attempts[username].locked_until
-        return None
+        """Get the time when account will be unlocked, or None if it is not locked"""
+        now = datetime.now()
+        with self._lock:
+            self._sweep(now)
+            attempt = self.locked.get(_key(username))
+            return attempt.locked_until if attempt else None
 
     def record_failed_attempt(self, username: str) -> None:
         """Record a failed login attempt"""
+        key = _key(username)
         now = datetime.now()
 
-        if username not in self.attempts:
-            self.attempts[username] = LoginAttempt(
-                failed_count=1,
-                locked_until=None,
-                last_attempt=now
-            )
-        else:
-            attempt = self.attempts[username]
-            attempt.failed_count += 1
-            attempt.last_attempt = now
+        with self._lock:
+            self._sweep(now)
+            if key in self.locked:
+                return
+
+            attempt = self.attempts.pop(key, None)
+            if attempt is None:
+                attempt = LoginAttempt(failed_count=1, locked_until=None, last_attempt=now)
+            else:
+                attempt.failed_count += 1
+                attempt.last_attempt = now
 
             # Lock account if max attempts reached
             if attempt.failed_count >= self.max_attempts:
                 attempt.locked_until = now + self.lockout_duration
+                self.locked[key] = attempt
+            else:
+                self.attempts[key] = attempt
+            self._evict()
 
-    def record_successful_login(self, username: str) -> None:
-        """Record successful login and reset counter"""
-        self.reset(username)
+    def reset(self, username: str) -> None:
+        """Reset login attempts for a user"""
+        key = _key(username)
+        with self._lock:
+            self.attempts.pop(key, None)
+            self.locked.pop(key, None)
+
+    def get_remaining_attempts(self, username: str) -> int:
+        """Get number of remaining login attempts"""
+        key = _key(username)
+        now = datetime.now()
+        with self._lock:
+            self._sweep(now)
+            if key in self.locked:
+                return 0
+            attempt = self.attempts.get(key)
+            if attempt is None:
+                return self.max_attempts
+            return max(0, self.max_attempts - attempt.failed_count)
+
+
+class SQLiteRateLimiter(BaseRateLimiter):
+    """
+    基于 SQLite 的登录限流器 - SQLite-backed rate limiter for login attempts
+
+    功能说明：
+    - 记录存放在 login_attempts 表中，所有 uvicorn worker 共享同一份计数
+    - 每次失败只执行一条原子 upsert，并发 worker 不会丢失计数
+    - 服务重启后锁定状态依然有效
+    - 定期清理过期记录；超过 max_entries 时删除最旧的未锁定记录
+
+    Rules:
+    - Same rules as the in-memory limiter (see BaseRateLimiter)
+    - Expired rows are swept at most once per `sweep_interval` seconds per process
+    """
+
+    # 单条语句完成计数、锁定和窗口过期重置 - One statement counts, locks and restarts expired windows
+    _RECORD_FAILURE = text("""
+        INSERT INTO login_attempts (key, failed_count, locked_until, last_attempt)
+        VALUES (:key, 1, CASE WHEN :max_attempts <= 1 THEN :lock_until END, :now)
+        ON CONFLICT(key) DO UPDATE SET
+            failed_count = CASE
+                WHEN locked_until > :now THEN failed_count
+                WHEN locked_until IS NOT NULL OR last_attempt <= :window_start THEN 1
+                ELSE failed_count + 1 END,
+            locked_until = CASE
+                WHEN locked_until > :now THEN locked_until
+                WHEN (CASE WHEN locked_until IS NOT NULL OR last_attempt <= :window_start
+                           THEN 1 ELSE failed_count + 1 END) >= :max_attempts THEN :lock_until
+                ELSE NULL END,
+            last_attempt = CASE WHEN locked_until > :now THEN last_attempt ELSE :now END
+    """)
+
+    _SWEEP_EXPIRED = text("""
+        DELETE FROM login_attempts
+        WHERE locked_until <= :now OR (locked_until IS NULL AND last_attempt <= :window_start)
+    """)
+
+    _TRIM_OLDEST = text("""
+        DELETE FROM login_attempts WHERE key IN (
+            SELECT key FROM login_attempts
+            ORDER BY locked_until IS NOT NULL, last_attempt
+            LIMIT max((SELECT count(*) FROM login_attempts) - :max_entries, 0)
+        )
+    """)
+
+    def __init__(
+        self,
+        engine: Engine,
+        max_attempts: int = 5,
+        lockout_duration_minutes: int = 30,
+        failure_window_minutes: int = 15,
+        max_entries: int = 10000,
+        sweep_interval: float = 60.0
+    ):
+        super().__init__(max_attempts, lockout_duration_minutes, failure_window_minutes)
+        self.engine = engine
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+        self._sweep_lock = threading.Lock()
+        self._table_ready = False
+
+    def _ensure_table(self) -> None:
+        """Create login_attempts on first use, so the limiter works before create_tables() has run"""
+        if self._table_ready:
+            return
+        from ..data.models import LoginAttemptRecord
+        LoginAttemptRecord.__table__.create(self.engine, checkfirst=True)
+        self._table_ready = True
+
+    def _maybe_sweep(self, now: float) -> None:
+        """Delete expired rows and trim to max_entries, at most once per sweep_interval"""
+        with self._sweep_lock:
+            if time.monotonic() < self._next_sweep:
+                return
+            self._next_sweep = time.monotonic() + self.sweep_interval
+
+        with self.engine.begin() as conn:
+            conn.execute(self._SWEEP_EXPIRED, {
+                "now": now,
+                "window_start": now - self.failure_window.total_seconds(),
+            })
+            conn.execute(self._TRIM_OLDEST, {"max_entries": self.max_entries})
+
+    def __len__(self) -> int:
+        self._ensure_table()
+        with self.engine.connect() as conn:
+            return conn.execute(text("SELECT count(*) FROM login_attempts")).scalar()
+
+    def get_lockout_time(self, username: str) -> Optional[datetime]:
+        """Get the time when account will be unlocked, or None if it is not locked"""
+        self._ensure_table()
+        with self.engine.connect() as conn:
+            locked_until = conn.execute(
+                text("SELECT locked_until FROM login_attempts WHERE key = :key AND locked_until > :now"),
+                {"key": _key(username), "now": time.time()},
+            ).scalar()
+        return datetime.fromtimestamp(locked_until) if locked_until is not None else None
+
+    def record_failed_attempt(self, username: str) -> None:
+        """Record a failed login attempt"""
+        self._ensure_table()
+        now = time.time()
+        with self.engine.begin() as conn:
+            conn.execute(self._RECORD_FAILURE, {
+                "key": _key(username),
+                "now": now,
+                "window_start": now - self.failure_window.total_seconds(),
+                "lock_until": now + self.lockout_duration.total_seconds(),
+                "max_attempts": self.max_attempts,
+            })
+        self._maybe_sweep(now)
 
     def reset(self, username: str) -> None:
         """Reset login attempts for a user"""
-        if username in self.attempts:
-            del self.attempts[username]
+        self._ensure_table()
+        with self.engine.begin() as conn:
+            conn.execute(text("DELETE FROM login_attempts WHERE key = :key"), {"key": _key(username)})
 
     def get_remaining_attempts(self, username: str) -> int:
         """Get number of remaining login attempts"""
-        if username not in self.attempts:
+        self._ensure_table()
+        now = time.time()
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                text("SELECT failed_count, locked_until, last_attempt FROM login_attempts WHERE key = :key"),
+                {"key": _key(username)},
+            ).first()
+
+        if row is None:
             return self.max_attempts
+        failed_count, locked_until, last_attempt = row
+        if locked_until is not None:
+            return 0 if locked_until > now else self.max_attempts
+        if last_attempt <= now - self.failure_window.total_seconds():
+            return self.max_attempts
+        return max(0, self.max_attempts - failed_count)
+
 
-        attempt = self.attempts[username]
-        remaining = self.max_attempts - attempt.failed_count
-        return max(0, remaining)
+def create_rate_limiter(backend: str) -> BaseRateLimiter:
+    """
+    根据配置创建登录限流器 - Create the login rate limiter for the configured backend
+
+    Args:
+        backend: "memory" or "sqlite"
+
+    Raises:
+        ValueError: If the backend is unknown or sqlite is requested for a non-SQLite DATABASE_URL
+    """
+    options = {
+        "max_attempts": 5,
+        "lockout_duration_minutes": 30,
+        "failure_window_minutes": settings.LOGIN_FAILURE_WINDOW_MINUTES,
+        "max_entries": settings.LOGIN_RATE_LIMIT_MAX_ENTRIES,
+    }
+    if backend == "memory":
+        return RateLimiter(**options)
+    if backend == "sqlite":
+        from ..data.database import engine
+        if engine.dialect.name != "sqlite":
+            raise ValueError(f"sqlite rate limiter backend requires a SQLite DATABASE_URL, got {engine.dialect.name}")
+        return SQLiteRateLimiter(engine, **options)
+    raise ValueError(f"Unknown rate limiter backend: {backend}")
 
 
 # Global rate limiter instance
-rate_limiter = RateLimiter(max_attempts=5, lockout_duration_minutes=30)
+rate_limiter = create_rate_limiter(settings.LOGIN_RATE_LIMIT_BACKEND)
+
+# 抓取时统计登录限流表大小 - Login limiter size, counted at scrape time
+metrics.rate_limiter_entries.set_function(lambda: {("login",): len(rate_limiter)}, source="login")
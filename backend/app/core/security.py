@@ -5,8 +5,12 @@ Security Authentication Module:
 Handles security-related functions such as password hashing, 
 JWT creation and verification, and user authentication.
 """
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -15,21 +19,42 @@ from sqlalchemy.orm import Session
 
 from ..data.database import get_db
 from ..data.models import User
+from . import metrics
 from .config import settings
+from .password_pool import PasswordPool
 
 
 # 密码加密上下文
 # Password encryption context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt 校验进程池
+# bcrypt verification process pool
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+)
+
+# 抓取时读取进程池队列状态 - Pool queue state, read at scrape time
+metrics.password_pool_queue_depth.set_function(lambda: password_pool.stats()["queued"])
+metrics.password_pool_inflight.set_function(lambda: password_pool.stats()["in_flight"])
+
 # OAuth2 密码认证
 # OAuth2 Password Authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码--Verify Password"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """
+    验证密码--Verify Password
+
+    bcrypt 在有界进程池中执行--bcrypt runs in the bounded password pool
+
+    Raises:
+        PasswordPoolBusy: If the verification queue is full
+    """
+    with metrics.password_verify_duration.time():
+        return password_pool.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
@@ -49,27 +74,108 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[str]:
-    """验证令牌并返回用户名--Verify the token and return the username"""
+def decode_token(token: str) -> Optional[dict]:
+    """验证令牌签名并返回载荷--Verify the token signature and return its payload"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-        return username
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except JWTError:
         return None
 
 
+def verify_token(token: str) -> Optional[str]:
+    """验证令牌并返回用户名--Verify the token and return the username"""
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    username: str = payload.get("sub")
+    if username is None:
+        return None
+    return username
+
+
+class TokenCache:
+    """
+    已验证令牌缓存 - Cache of verified tokens and their resolved users
+
+    Rules:
+    - Keyed by the SHA-256 of the token, raw tokens are never stored
+    - An entry lives for `ttl_seconds` at most, and never past the token's `exp`
+    - At most `max_size` entries, least recently used evicted first
+    - clear() drops everything (e.g. after a password change)
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: int = 300):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[User]:
+        """Cached user for a token, or None if missing or expired"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def put(self, token: str, user: User, token_exp: Optional[float]) -> None:
+        """Cache a user for a token until min(now + ttl, token exp)"""
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached token"""
+        with self._lock:
+            self._entries.clear()
+
+
+# 已验证令牌缓存
+# Verified token cache
+token_cache = TokenCache(
+    max_size=settings.TOKEN_CACHE_SIZE,
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """获取当前用户 - FastAPI 依赖项--Get the current user"""
+    """
+    获取当前用户 - FastAPI 依赖项--Get the current user
+
+    重复请求直接命中令牌缓存，跳过 JWT 签名校验和数据库查询
+    Repeat requests hit the token cache and skip both the JWT signature check and the DB query
+    """
+    cached_user = token_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
-    )                                                                                   
+    )
 
-    username = verify_token(token)
+    payload = decode_token(token)
+    username = payload.get("sub") if payload else None
     if username is None:
         raise credentials_exception
 
@@ -77,6 +183,10 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     if user is None:
         raise credentials_exception
 
+    # 从会话中分离后缓存，供后续请求复用 - Detach from the session so later requests can reuse it
+    db.expunge(user)
+    token_cache.put(token, user, payload.get("exp"))
+
     return user
 
 
@@ -0,0 +1,225 @@
+"""
+请求限流中间件 - Request throttling middleware
+按客户端（已登录用户或IP）和路由类别分配令牌桶，超出预算返回 429
+Token buckets per client (authenticated subject or IP) and route class; over-budget requests get 429
+"""
+import ipaddress
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from . import metrics
+from .security import token_cache
+
+IPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+
+@dataclass(slots=True)
+class _Bucket:
+    """Tokens left and when they were last topped up"""
+    tokens: float
+    updated: float
+
+
+class TokenBucketLimiter:
+    """
+    令牌桶限流器 - Token bucket limiter for one route class
+
+    Rules:
+    - Every client starts with `capacity` tokens; each request takes one
+    - Tokens refill continuously at `refill_per_second`, up to `capacity`
+    - Refill is computed lazily on access, so each request costs O(1)
+    - At most `max_clients` buckets are kept, least recently used evicted first
+      (an evicted client simply starts again with a full bucket)
+
+    Not thread-safe: the middleware only calls it from the event loop
+    """
+
+    def __init__(self, capacity: int, refill_per_second: float, max_clients: int = 10000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_clients = max_clients
+        self.buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """
+        Take one token for a client
+
+        Returns:
+            0 if the request is allowed, otherwise the seconds until a token is available
+        """
+        if now is None:
+            now = time.monotonic()
+
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = _Bucket(tokens=self.capacity, updated=now)
+            if len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+            bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.updated) * self.refill_per_second)
+            bucket.updated = now
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return 0.0
+        if self.refill_per_second <= 0:
+            return math.inf
+        return (1 - bucket.tokens) / self.refill_per_second
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+
+def parse_budgets(spec: str) -> Dict[str, Tuple[int, float]]:
+    """
+    解析路由类别预算 - Parse route class budgets
+
+    Format: comma-separated `class=burst/per_minute`, e.g. "auth=10/10,read=120/1200"
+
+    Returns:
+        {route class: (bucket capacity, refill per second)}
+    """
+    budgets = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, budget = item.partition("=")
+        burst, _, per_minute = budget.partition("/")
+        budgets[name.strip()] = (int(burst), float(per_minute) / 60)
+    return budgets
+
+
+@lru_cache(maxsize=1024)
+def _parse_ip(value: str) -> Optional[IPAddress]:
+    try:
+        return ipaddress.ip_address(value.strip())
+    except ValueError:
+        return None
+
+
+class ThrottleMiddleware:
+    """
+    全局限流 ASGI 中间件 - API-wide throttling ASGI middleware
+
+    功能说明：
+    - 请求按方法和路径归入路由类别（auth / bulk / read / write / default），每个类别独立预算
+    - 携带已验证令牌的请求按用户名计数，其余请求按客户端IP计数
+    - 仅当直接连接方是受信任代理（nginx）时才使用 X-Forwarded-For 中的地址
+    - 超出预算返回 429 和 Retry-After 响应头
+
+    Rules:
+    - CORS preflight (OPTIONS) requests are never throttled
+    - The subject is only taken from tokens already verified by the token cache,
+      so a forged token falls back to the caller's IP
+    - X-Forwarded-For is read right to left, skipping trusted proxies
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        budgets: Dict[str, Tuple[int, float]],
+        trusted_proxies: List[str],
+        max_clients: int = 10000,
+        api_prefix: str = "/api",
+    ):
+        self.app = app
+        self.admin_prefix = api_prefix + "/admin"
+        # 批量导入导出按方法和完整路径识别，不影响slug恰好为 bulk/export 的普通文章请求
+        # Bulk routes are matched by method and exact path, so ordinary requests for a post slugged "bulk" aren't
+        self.bulk_routes = {
+            ("POST", self.admin_prefix + "/posts/bulk"),
+            ("GET", self.admin_prefix + "/posts/export"),
+            ("HEAD", self.admin_prefix + "/posts/export"),
+        }
+        self.limiters = {
+            name: TokenBucketLimiter(capacity, refill, max_clients)
+            for name, (capacity, refill) in budgets.items()
+        }
+        self.trusted_networks = [ipaddress.ip_network(net.strip(), strict=False) for net in trusted_proxies if net.strip()]
+
+        # 抓取时统计各路由类别的客户端数 - Clients per route class, counted at scrape time
+        metrics.rate_limiter_entries.set_function(
+            lambda: {(f"throttle_{name}",): len(limiter) for name, limiter in self.limiters.items()},
+            source="throttle",
+        )
+
+    def classify(self, method: str, path: str) -> Optional[str]:
+        """Route class of a request, or None if it is not throttled"""
+        if method == "OPTIONS":
+            return None
+        if path == "/token":
+            route_class = "auth"
+        elif path.startswith(self.admin_prefix):
+            if (method, path) in self.bulk_routes:
+                route_class = "bulk"
+            elif method in ("GET", "HEAD"):
+                route_class = "read"
+            else:
+                route_class = "write"
+        else:
+            route_class = "default"
+        return route_class if route_class in self.limiters else None
+
+    def _is_trusted(self, address: Optional[IPAddress]) -> bool:
+        return address is not None and any(address in net for net in self.trusted_networks)
+
+    def client_ip(self, scope: Scope, forwarded_for: Optional[str]) -> str:
+        """Client address, taken from X-Forwarded-For only when the peer is a trusted proxy"""
+        peer = scope.get("client")
+        peer_ip = peer[0] if peer else "unknown"
+        if not forwarded_for or not self._is_trusted(_parse_ip(peer_ip)):
+            return peer_ip
+
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not self._is_trusted(_parse_ip(hop)):
+                return hop
+        return hops[0] if hops else peer_ip
+
+    def client_key(self, scope: Scope) -> str:
+        """Throttling key: verified subject if available, otherwise client IP"""
+        authorization = None
+        forwarded_for = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value.decode("latin-1")
+            elif name == b"x-forwarded-for":
+                forwarded_for = value.decode("latin-1")
+
+        if authorization and authorization[:7].lower() == "bearer ":
+            user = token_cache.get(authorization[7:].strip())
+            if user is not None:
+                return f"user:{user.username}"
+        return f"ip:{self.client_ip(scope, forwarded_for)}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self.classify(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        wait = self.limiters[route_class].acquire(self.client_key(scope))
+        if wait > 0:
+            retry_after = str(math.ceil(wait)) if math.isfinite(wait) else "3600"
+            response = JSONResponse(
+                {"detail": "Too many requests. Please slow down."},
+                status_code=429,
+                headers={"Retry-After": retry_after},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -4,7 +4,7 @@
 Database connection and session management 
 Configure the SQLAlchemy engine and provide database session dependencies
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
@@ -12,14 +12,54 @@ from typing import Generator
 from ..core.config import settings
 
 # 创建数据库引擎
-# SQLite 不需要连接池，但为了兼容性保留 pool_pre_ping
+# 文件型 SQLite：不使用 pool_pre_ping（本地文件不会断开），连接池大小按线程池并发配置
+# 连接建立时应用 SQLite 调优参数（WAL、synchronous、busy_timeout 等）
 # Create the database engine
-# SQLite does not require a connection pool, but pool_pre_ping is retained for compatibility.
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},  # SQLite-specific configuration
-    pool_pre_ping=True,
-)
+# File-backed SQLite: no pool_pre_ping (a local file never drops the connection), pool sized for threadpool concurrency
+# SQLite tuning pragmas (WAL, synchronous, busy_timeout, ...) are applied on every new connection
+_is_sqlite = settings.DATABASE_URL.startswith("sqlite")
+# 每个线程池线程一个连接，避免请求排队等待连接 - One connection per threadpool thread so requests never queue on the pool
+_pool_size = settings.DB_POOL_SIZE or settings.THREADPOOL_SIZE
+_is_sqlite_file = _is_sqlite and ":memory:" not in settings.DATABASE_URL and settings.DATABASE_URL not in ("sqlite://", "sqlite:///")
+
+if _is_sqlite_file:
+    engine = create_engine(
+        settings.DATABASE_URL,
+        connect_args={
+            "check_same_thread": False,  # SQLite-specific configuration
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
+        pool_size=_pool_size,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+elif _is_sqlite:
+    engine = create_engine(
+        settings.DATABASE_URL,
+        connect_args={"check_same_thread": False},  # SQLite-specific configuration
+    )
+else:
+    engine = create_engine(
+        settings.DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=_pool_size,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+
+
+if _is_sqlite:
+    @event.listens_for(engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        为每个新连接应用 SQLite 调优参数
+        Apply the SQLite tuning profile to every new connection
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.close()
 
 # 创建会话工厂
 # autocommit=False: 事务需手动提交
@@ -4,7 +4,7 @@ SQLAlchemy 数据模型定义
 SQLAlchemy data model definition 
 defines the structure of all database tables used in the application.
 """
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import JSON, Column, DateTime, Float, Integer, String, Text
 from .database import Base
 
 
@@ -29,4 +29,60 @@ class User(Base):
 
     def __repr__(self):
         """字符串表示，方便调试--String representation for easy debugging"""
-        return f"<User(id={self.id}, username='{self.username}')>"
\ No newline at end of file
+        return f"<User(id={self.id}, username='{self.username}')>"
+
+
+class LoginAttemptRecord(Base):
+    """
+    登录失败记录表 - SQLite 限流后端使用，多个 worker 和重启之间共享
+    对应数据库中的 login_attempts 表
+    Login failure table - used by the SQLite rate limiter backend,
+    shared across uvicorn workers and restarts
+    """
+    __tablename__ = "login_attempts"
+
+    # 用户名（过长时为其哈希）--Username (or its hash when overlong)
+    key = Column(String, primary_key=True)
+
+    failed_count = Column(Integer, nullable=False, default=0)
+
+    # Unix 时间戳（秒），未锁定时为空--Unix timestamps (seconds); locked_until is NULL while unlocked
+    locked_until = Column(Float, nullable=True, index=True)
+    last_attempt = Column(Float, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<LoginAttemptRecord(key='{self.key}', failed_count={self.failed_count})>"
+
+
+class BuildHistory(Base):
+    """
+    构建历史表 - 每次 Astro 构建（包括跳过和失败的构建）结束后写入一行
+    用于跟踪构建耗时随内容增长的变化，并与保存变慢的时间点对照
+    Build history table - one row per finished Astro build (including skipped and failed ones)
+    Used to track build-time regressions as the content directory grows
+    """
+    __tablename__ = "build_history"
+
+    id = Column(String, primary_key=True)
+    reason = Column(String, nullable=False)
+    slugs = Column(JSON, nullable=False, default=list)
+    status = Column(String, nullable=False, index=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # 从请求到开始构建的等待（含防抖窗口）和构建本身的耗时（秒）
+    # Wait from request to build start (including the debounce window) and build wall time, in seconds
+    queue_wait_seconds = Column(Float, nullable=True)
+    wall_seconds = Column(Float, nullable=True)
+
+    # 构建进程树的峰值常驻内存（KiB）、退出码和输出末尾
+    # Peak resident memory of the build process tree (KiB), exit code and the end of its output
+    peak_rss_kb = Column(Integer, nullable=True)
+    exit_code = Column(Integer, nullable=True)
+    log_tail = Column(Text, nullable=True)
+
+    def __repr__(self):
+        return f"<BuildHistory(id='{self.id}', status='{self.status}')>"
@@ -3,34 +3,53 @@ FastAPI博客后端应用程序 - FastAPI Blog Backend Application
 主应用程序入口点，包含路由配置和中间件设置 - Main application entry point with route configuration and middleware setup
 """
 from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
 
 from .core.config import settings, ALLOWED_ORIGINS
+from .core.cors import OriginPolicy, PolicyCORSMiddleware
+from .core.throttle import ThrottleMiddleware, parse_budgets
+from .core.metrics import REGISTRY, CONTENT_TYPE, MetricsMiddleware
 from .data.database import create_tables
-from .api import auth, posts
+from .api import auth, posts, builds
 from .core.init_admin import init_admin_user
+from .core.security import password_pool
+from .services.build_service import build_scheduler, resume_pending_builds
+from .services.post_watcher import post_watcher
+from .services.search_service import search_index
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     应用程序生命周期管理 - Application lifespan management
 
-    启动时：创建数据库表并初始化管理员用户
-    关闭时：清理资源（如需要）
+    启动时：创建数据库表、初始化管理员用户、启动构建工作线程和文章目录监听
+    关闭时：停止文章目录监听和构建工作线程
 
-    Startup: Create database tables and initialize admin user
-    Shutdown: Cleanup resources (if needed)
+    Startup: Create database tables, initialize admin user, start the build worker and posts watcher
+    Shutdown: Stop the posts watcher and build worker
     """
+    # 设置同步路由线程池上限 - Bound the threadpool used by sync routes
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+
     # 启动时执行 - Execute on startup
     create_tables()
+    search_index.ensure_schema()
     print("Database tables created/verified")
 
     # 初始化管理员用户
     print("Initializing admin user...")
     init_admin_user()
 
+    # 启动后台构建工作线程，并恢复上次关机时未完成的构建 - Start the build worker and resume builds cut off by the last shutdown
+    build_scheduler.start()
+    resume_pending_builds()
+
+    # 启动文章目录监听 - Start posts directory watcher
+    post_watcher.start()
+
     print(f"API Documentation available at: http://localhost:8000/docs")
     print(f"Authentication endpoint: POST /token")
     print(f"Admin posts endpoint: {settings.API_PREFIX}/admin/posts")
@@ -39,6 +58,9 @@ async def lifespan(app: FastAPI):
     yield  # 应用程序运行期间 - Application running
 
     print("Shutting down...")
+    await post_watcher.stop()
+    build_scheduler.stop(timeout=5)
+    password_pool.shutdown()
 
 
 # 创建FastAPI应用程序实例 - Create FastAPI application instance
@@ -51,15 +73,30 @@ app = FastAPI(
     lifespan=lifespan  # 使用生命周期管理器 - Use lifespan manager
 )
 
+# 配置限流中间件（在CORS之内，429响应也带CORS头） - Configure throttling (inside CORS so 429s carry CORS headers)
+if settings.THROTTLE_ENABLED:
+    app.add_middleware(
+        ThrottleMiddleware,
+        budgets=parse_budgets(settings.THROTTLE_BUDGETS),
+        trusted_proxies=settings.THROTTLE_TRUSTED_PROXIES.split(","),
+        max_clients=settings.THROTTLE_MAX_CLIENTS,
+        api_prefix=settings.API_PREFIX,
+    )
+
 # 配置CORS中间件 - Configure CORS middleware
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=ALLOWED_ORIGINS,
+    PolicyCORSMiddleware,
+    origin_policy=OriginPolicy(ALLOWED_ORIGINS),
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
     allow_headers=["*"],
+    # 分页信息通过响应头返回 - Pagination info is returned in response headers
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "Retry-After"],
 )
 
+# 请求延迟指标（最外层，包含限流和CORS的耗时） - Request latency metrics (outermost, includes throttling and CORS)
+app.add_middleware(MetricsMiddleware)
+
 # 包含API路由器 - Include API routers
 app.include_router(auth.router, tags=["Authentication"])
 app.include_router(
@@ -67,6 +104,11 @@ app.include_router(
     prefix=settings.API_PREFIX + "/admin",
     tags=["Posts Management"]
 )
+app.include_router(
+    builds.router,
+    prefix=settings.API_PREFIX + "/admin",
+    tags=["Builds"]
+)
 
 # 健康检查端点 - Health check endpoint
 @app.get("/")
@@ -78,11 +120,30 @@ async def root():
     - 返回基本的应用程序状态信息
     - 用于确认API服务是否正常运行
     - 可用于负载均衡器的健康检查
+    - 包含密码校验进程池的队列深度
 
-    Returns basic application status
+    Returns basic application status and password verification queue depth
     """
     return {
         "message": "Blog Backend API is running!",
         "version": settings.VERSION,
-        "project": settings.PROJECT_NAME
-    }
\ No newline at end of file
+        "project": settings.PROJECT_NAME,
+        "password_pool": password_pool.stats()
+    }
+
+
+# Prometheus 指标端点 - Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus 指标端点 - Prometheus metrics endpoint
+
+    功能说明：
+    - 以 Prometheus 文本格式返回请求延迟、文章扫描、frontmatter解析、bcrypt、构建和限流器指标
+    - 队列深度和限流器大小等仪表只在抓取时计算
+
+    Note:
+        nginx only proxies /api, /docs and /token, so this endpoint is reachable
+        from inside the Docker network (the scraper) but not from the public site
+    """
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
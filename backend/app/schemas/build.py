@@ -0,0 +1,30 @@
+"""
+构建相关的 Pydantic API 数据契约模型
+Build-related Pydantic models for API data contracts
+"""
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+
+class BuildStatus(BaseModel):
+    """
+    构建状态模型 - 用于查询后台 Astro 构建进度
+    Build status model - used to poll background Astro build progress
+    """
+    id: str
+    status: str  # queued | running | succeeded | failed | skipped
+    reason: str
+    slugs: List[str] = []
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    queue_wait_seconds: Optional[float] = None
+    wall_seconds: Optional[float] = None
+    peak_rss_kb: Optional[int] = None
+    exit_code: Optional[int] = None
+    log_tail: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -4,11 +4,20 @@
 Post-related Pydantic models for API data contracts
 Must match the Astro frontend content.config.ts schema exactly
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime, date
 
 
+class ReadingMetadata(BaseModel):
+    """
+    阅读统计模型 - 写入文章时由后端计算
+    Reading statistics model - computed by the backend when a post is written
+    """
+    wordCount: int
+    readingTime: Optional[int] = None  # minutes
+
+
 class PostMetadata(BaseModel):
     """
     帖子元数据模型 - 匹配前端 AdminPostCard.astro Props 接口
@@ -29,6 +38,7 @@ class PostMetadata(BaseModel):
     sourceLink: Optional[str] = None
     licenseName: Optional[str] = None
     licenseUrl: Optional[str] = None
+    readingMetadata: Optional[ReadingMetadata] = None
 
 
 class PostCreate(BaseModel):
@@ -75,6 +85,22 @@ class PostUpdate(BaseModel):
     licenseUrl: Optional[str] = None
 
 
+class PostBatchUpdateItem(PostUpdate):
+    """
+    批量更新中的单项操作 - 目标slug加上要修改的字段
+    Single operation of a batch update - the target slug plus the fields to change
+    """
+    slug: str
+
+
+class PostBatchUpdate(BaseModel):
+    """
+    批量更新请求模型 - 整批只触发一次重建
+    Batch update request model - the whole batch triggers a single rebuild
+    """
+    operations: List[PostBatchUpdateItem] = Field(..., min_length=1, max_length=500)
+
+
 class PostFull(PostMetadata):
     """
     完整的帖子模型 - 包含内容主体
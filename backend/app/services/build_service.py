@@ -0,0 +1,625 @@
+"""
+Astro 构建调度服务 - Astro build scheduling service
+在后台工作线程中执行 Astro 重建，避免阻塞请求处理 - Runs Astro rebuilds in a background worker so requests are never blocked
+"""
+import hashlib
+import json
+import os
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core import metrics
+from ..core.config import settings
+from ..data.database import SessionLocal
+from ..data.models import BuildHistory
+
+
+# 构建状态常量 - Build status constants
+BUILD_QUEUED = "queued"
+BUILD_RUNNING = "running"
+BUILD_SUCCEEDED = "succeeded"
+BUILD_FAILED = "failed"
+BUILD_SKIPPED = "skipped"
+
+
+@dataclass
+class BuildRecord:
+    """Record of a single scheduled Astro build"""
+    id: str
+    reason: str
+    slugs: List[str]
+    status: str = BUILD_QUEUED
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    queue_wait_seconds: Optional[float] = None
+    wall_seconds: Optional[float] = None
+    peak_rss_kb: Optional[int] = None
+    exit_code: Optional[int] = None
+    log_tail: Optional[str] = None
+
+
+@dataclass
+class BuildResult:
+    """Outcome of one `pnpm run build` run"""
+    success: bool
+    exit_code: Optional[int] = None
+    wall_seconds: Optional[float] = None
+    peak_rss_kb: Optional[int] = None
+    log_tail: str = ""
+    error: Optional[str] = None
+
+
+class BuildManifest:
+    """
+    构建清单 - Build manifest of changed slugs
+
+    功能说明：
+    - built：上次成功构建时每篇文章的内容哈希
+    - pending：自上次成功构建以来被增删改的slug（附带变更序号）
+    - 构建前对比 pending 中文章的当前哈希与 built，全部相同则跳过构建
+    - 构建失败时 pending 保留，下一次构建会继续处理
+
+    Rules:
+    - Persisted as JSON next to the database so it survives restarts
+    - A slug leaves `pending` only when the build that saw its latest change succeeds
+    - Deleted posts hash to None and are removed from `built` once built
+    """
+
+    def __init__(self, path: Path, posts_dir: Path):
+        self.path = path
+        self.posts_dir = posts_dir
+        self.built: Dict[str, str] = {}
+        self.pending: Dict[str, int] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.built = dict(data.get("built", {}))
+            self.pending = {slug: int(seq) for slug, seq in data.get("pending", {}).items()}
+            self._seq = max(self.pending.values(), default=0)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error reading build manifest {self.path}: {e}")
+
+    def _save(self) -> None:
+        """Persist the manifest atomically (caller holds the lock)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"built": self.built, "pending": self.pending}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def content_hash(self, slug: str) -> Optional[str]:
+        """SHA-256 of a post file, or None if it no longer exists"""
+        try:
+            with open(self.posts_dir / f"{slug}.md", 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    def mark(self, slugs: List[str]) -> None:
+        """Record slugs changed since the last successful build (in memory; call persist() to save)"""
+        if not slugs:
+            return
+        with self._lock:
+            self._seq += 1
+            for slug in slugs:
+                self.pending[slug] = self._seq
+
+    def persist(self) -> None:
+        """Write the current manifest to disk"""
+        with self._lock:
+            self._save()
+
+    def pending_slugs(self) -> List[str]:
+        """Slugs changed since the last successful build"""
+        with self._lock:
+            return list(self.pending)
+
+    def collect(self) -> Tuple[Dict[str, int], Dict[str, Optional[str]]]:
+        """
+        Snapshot the pending slugs and hash them
+
+        Returns:
+            (pending snapshot, {slug: current hash} for slugs whose content differs from the last build)
+        """
+        with self._lock:
+            snapshot = dict(self.pending)
+            built = dict(self.built)
+
+        changes = {}
+        for slug in snapshot:
+            current = self.content_hash(slug)
+            if current != built.get(slug):
+                changes[slug] = current
+        return snapshot, changes
+
+    def commit(self, snapshot: Dict[str, int], changes: Dict[str, Optional[str]]) -> None:
+        """Mark a snapshot as built: store its hashes and clear slugs not changed again since"""
+        with self._lock:
+            for slug, digest in changes.items():
+                if digest is None:
+                    self.built.pop(slug, None)
+                else:
+                    self.built[slug] = digest
+            for slug, seq in snapshot.items():
+                if self.pending.get(slug) == seq:
+                    del self.pending[slug]
+            self._save()
+
+
+class BuildHistoryStore:
+    """
+    构建历史存储 - Persisted build history
+
+    功能说明：
+    - 每次构建结束（成功、失败、跳过或关机取消）后写入 build_history 表
+    - 只保留最近 `limit` 条记录，超出部分在写入时删除
+    - 写入失败只打印日志，不影响构建本身
+
+    Rules:
+    - Records are stored once they are finished; queued and running builds live only in memory
+    - Listing is newest first by creation time
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], limit: int = 1000):
+        self.session_factory = session_factory
+        self.limit = limit
+
+    def save(self, record: BuildRecord) -> None:
+        """Insert or update a finished build and trim the table to `limit` rows"""
+        try:
+            with self.session_factory() as db:
+                db.merge(BuildHistory(
+                    id=record.id,
+                    reason=record.reason,
+                    slugs=list(record.slugs),
+                    status=record.status,
+                    error=record.error,
+                    created_at=record.created_at,
+                    started_at=record.started_at,
+                    finished_at=record.finished_at,
+                    queue_wait_seconds=record.queue_wait_seconds,
+                    wall_seconds=record.wall_seconds,
+                    peak_rss_kb=record.peak_rss_kb,
+                    exit_code=record.exit_code,
+                    log_tail=record.log_tail,
+                ))
+                db.flush()
+                cutoff = (
+                    db.query(BuildHistory.created_at)
+                    .order_by(BuildHistory.created_at.desc())
+                    .offset(self.limit)
+                    .limit(1)
+                    .scalar()
+                )
+                if cutoff is not None:
+                    db.query(BuildHistory).filter(BuildHistory.created_at <= cutoff).delete(synchronize_session=False)
+                db.commit()
+        except Exception as e:
+            print(f"Error saving build history for {record.id}: {e}")
+
+    def get(self, build_id: str) -> Optional[BuildHistory]:
+        """Get a stored build by id"""
+        with self.session_factory() as db:
+            return db.get(BuildHistory, build_id)
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Tuple[List[BuildHistory], int]:
+        """
+        Page of stored builds, newest first
+
+        Returns:
+            (builds on this page, total number of matching builds)
+        """
+        with self.session_factory() as db:
+            query = db.query(BuildHistory)
+            if status:
+                query = query.filter(BuildHistory.status == status)
+            total = query.with_entities(func.count(BuildHistory.id)).scalar()
+            rows = query.order_by(BuildHistory.created_at.desc()).offset(offset).limit(limit).all()
+        return rows, total
+
+
+class BuildScheduler:
+    """
+    后台构建调度器 - Background build scheduler
+
+    功能说明：
+    - 接收构建请求后立即返回构建ID，不等待构建完成
+    - 防抖合并：静默窗口内的所有文章变更合并为一次构建
+    - 构建进行中到达的变更最多只会产生一次后续构建
+    - 在内存中保留最近的构建记录，供状态查询接口使用
+
+    Rules:
+    - schedule() never blocks on the build itself
+    - Requests arriving while a build is pending join that build (same id)
+    - A build whose slugs all hash the same as at the last successful build is skipped
+    - A build starts only after `debounce_seconds` without new requests
+    - At most one build runs and at most one follow-up build waits
+    - Only the most recent `history_size` records are kept in memory;
+      finished builds are also written to `history` if one is given
+    """
+
+    def __init__(
+        self,
+        debounce_seconds: float = 0.0,
+        history_size: int = 100,
+        manifest: Optional[BuildManifest] = None,
+        history: Optional[BuildHistoryStore] = None,
+    ):
+        self.debounce_seconds = debounce_seconds
+        self.manifest = manifest
+        self.history = history
+        self.history_size = history_size
+        self.builds: "OrderedDict[str, BuildRecord]" = OrderedDict()
+        self._pending: Optional[BuildRecord] = None
+        self._last_request = 0.0
+        self._stopping = False
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the worker thread (idempotent)"""
+        with self._cond:
+            if self._worker and self._worker.is_alive():
+                return
+            self._stopping = False
+            self._worker = threading.Thread(
+                target=self._run, name="astro-build-worker", daemon=True
+            )
+            self._worker.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Ask the worker to exit after the current build and wait for it"""
+        worker = self._worker
+        if not worker:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        worker.join(timeout)
+        self._worker = None
+
+    def schedule(self, reason: str, slugs: Optional[List[str]] = None) -> BuildRecord:
+        """
+        登记一次构建请求 - Register a build request
+
+        如果已有等待中的构建，则合并到该构建中并重置静默窗口
+        If a build is already pending, the request is merged into it and the quiet window restarts
+
+        Args:
+            reason: Why the build was requested (e.g. "create", "update", "delete")
+            slugs: Post slugs involved in the change
+
+        Returns:
+            The pending build record; its id can be polled via the builds API
+        """
+        with self._cond:
+            record = self._pending
+            if record is None:
+                record = BuildRecord(id=uuid.uuid4().hex, reason=reason, slugs=[])
+                self._pending = record
+                self._remember(record)
+            elif reason not in record.reason.split(","):
+                record.reason = f"{record.reason},{reason}"
+
+            for slug in slugs or []:
+                if slug not in record.slugs:
+                    record.slugs.append(slug)
+
+            # 只在锁内更新内存中的 pending，写盘放到锁外 - Only the in-memory update happens under the lock
+            if self.manifest:
+                self.manifest.mark(slugs or [])
+
+            self._last_request = time.monotonic()
+            self._cond.notify_all()
+
+        if self.manifest and slugs:
+            self.manifest.persist()
+
+        self.start()
+        return record
+
+    def resume(self) -> Optional[BuildRecord]:
+        """
+        恢复未完成的构建 - Resume builds left unfinished by a previous run
+
+        关机时被取消或失败的构建，其slug仍保留在清单的 pending 中，启动时重新调度
+        Slugs of builds cancelled at shutdown (or failed) stay pending in the manifest;
+        they are scheduled again on startup so saved posts always reach the site
+
+        Returns:
+            The scheduled build record, or None if nothing is pending
+        """
+        slugs = self.manifest.pending_slugs() if self.manifest else []
+        if not slugs:
+            return None
+        return self.schedule("startup", slugs)
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Number of queued and running builds"""
+        with self._cond:
+            statuses = [record.status for record in self.builds.values()]
+        return {status: statuses.count(status) for status in (BUILD_QUEUED, BUILD_RUNNING)}
+
+    def get(self, build_id: str) -> Optional[BuildRecord]:
+        """Get a build record by id"""
+        with self._cond:
+            return self.builds.get(build_id)
+
+    def _remember(self, record: BuildRecord) -> None:
+        """Store a record and drop the oldest finished ones (caller holds the lock)"""
+        self.builds[record.id] = record
+        while len(self.builds) > self.history_size:
+            oldest_id, oldest = next(iter(self.builds.items()))
+            if oldest.status in (BUILD_QUEUED, BUILD_RUNNING):
+                break
+            del self.builds[oldest_id]
+
+    def _next_build(self) -> Optional[BuildRecord]:
+        """Wait until the pending build's quiet window has elapsed, then claim it"""
+        with self._cond:
+            while True:
+                if self._stopping:
+                    cancelled = self._pending
+                    if cancelled:
+                        cancelled.status = BUILD_FAILED
+                        cancelled.error = "Cancelled: server shutting down (resumed on next start)"
+                        cancelled.finished_at = datetime.now()
+                        self._pending = None
+                    break
+
+                if self._pending is None:
+                    self._cond.wait()
+                    continue
+
+                remaining = self._last_request + self.debounce_seconds - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+
+                record = self._pending
+                self._pending = None
+                record.status = BUILD_RUNNING
+                record.started_at = datetime.now()
+                record.queue_wait_seconds = (record.started_at - record.created_at).total_seconds()
+                return record
+
+        if cancelled and self.history:
+            self.history.save(cancelled)
+        return None
+
+    def _run(self) -> None:
+        """Worker loop: execute coalesced builds one by one"""
+        while True:
+            record = self._next_build()
+            if record is None:
+                return
+
+            try:
+                snapshot, changes = self.manifest.collect() if self.manifest else ({}, {})
+                if self.manifest and record.slugs and not changes:
+                    # 内容与上次成功构建完全相同，跳过构建 - Content identical to the last successful build
+                    print(f"Astro rebuild skipped: no content changes in {record.slugs}")
+                    self.manifest.commit(snapshot, changes)
+                    record.status = BUILD_SKIPPED
+                    continue
+
+                result = trigger_astro_rebuild()
+                record.exit_code = result.exit_code
+                record.wall_seconds = result.wall_seconds
+                record.peak_rss_kb = result.peak_rss_kb
+                record.log_tail = result.log_tail
+                record.error = result.error
+                if result.wall_seconds is not None:
+                    metrics.build_duration.observe(result.wall_seconds)
+                if result.success and self.manifest:
+                    self.manifest.commit(snapshot, changes)
+                record.status = BUILD_SUCCEEDED if result.success else BUILD_FAILED
+            except Exception as e:
+                record.status = BUILD_FAILED
+                record.error = str(e)
+            finally:
+                record.finished_at = datetime.now()
+                metrics.builds.inc(outcome=record.status)
+                if self.history:
+                    self.history.save(record)
+
+
+# 构建超时（秒）- Build timeout in seconds
+BUILD_TIMEOUT_SECONDS = 300
+
+
+def trigger_astro_rebuild() -> BuildResult:
+    """
+    触发 Astro 项目重建
+
+    注意：
+    在 Astro 项目目录中执行 pnpm run build 命令
+    这是使文章更改生效的关键步骤
+    该函数是阻塞的，只应在构建工作线程中调用
+    Trigger Astro project rebuild
+
+    Note:
+        Execute pnpm run build command in Astro project directory
+        This is the key step to make article changes take effect
+        Blocking call - only run it from the build worker thread
+
+    Returns:
+        Exit code, wall time, peak RSS and the last BUILD_LOG_TAIL_BYTES of combined stdout/stderr
+    """
+    astro_project_path = Path(settings.ASTRO_PROJECT_PATH)
+
+    if not astro_project_path.exists():
+        error = f"Astro project directory does not exist: {astro_project_path}"
+        print(f"Error: {error}")
+        return BuildResult(success=False, error=error)
+
+    print(f"Starting Astro project rebuild: {astro_project_path}")
+    started = time.perf_counter()
+    try:
+        # 执行构建命令--Execute build command
+        result = _run_build_command(["pnpm", "run", "build"], astro_project_path, BUILD_TIMEOUT_SECONDS)
+    except Exception as e:
+        print(f"Error triggering build: {e}")
+        return BuildResult(success=False, wall_seconds=time.perf_counter() - started, error=str(e))
+
+    if result.success:
+        print(f"Astro project build successful ({result.wall_seconds:.1f}s)")
+    else:
+        print(f"Astro project build failed: {result.error}")
+        print("Build output (tail):", result.log_tail)
+    return result
+
+
+def _run_build_command(command: List[str], cwd: Path, timeout: float) -> BuildResult:
+    """
+    运行构建命令并采集资源使用 - Run the build command and collect its resource usage
+
+    功能说明：
+    - stdout 和 stderr 合并读取，只保留末尾 BUILD_LOG_TAIL_BYTES 字节，内存占用有上限
+    - 命令在独立进程组中运行，超时后整个进程组（pnpm 及其启动的 node）一起被杀掉
+    - 通过 wait4 回收进程以取得峰值常驻内存；Linux 上该值覆盖已被回收的子孙进程，单位为 KiB
+
+    Peak RSS is the largest process in the build tree. Linux counts the forked child's
+    pre-exec memory too, so the value never drops below the backend's own RSS.
+    Platforms without os.wait4 fall back to a plain wait and report no peak RSS
+    """
+    tail_limit = settings.BUILD_LOG_TAIL_BYTES
+    tail: "deque[str]" = deque()
+    tail_size = 0
+
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+        start_new_session=True,
+    )
+
+    def read_output() -> None:
+        nonlocal tail_size
+        for line in process.stdout:
+            tail.append(line)
+            tail_size += len(line)
+            while tail_size > tail_limit and len(tail) > 1:
+                tail_size -= len(tail.popleft())
+
+    timed_out = threading.Event()
+
+    def kill() -> None:
+        timed_out.set()
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+
+    reader = threading.Thread(target=read_output, name="astro-build-output", daemon=True)
+    reader.start()
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    peak_rss_kb = None
+    try:
+        if hasattr(os, "wait4"):
+            _, wait_status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(wait_status)
+            peak_rss_kb = usage.ru_maxrss
+        else:
+            process.wait()
+    finally:
+        timer.cancel()
+    wall_seconds = time.perf_counter() - started
+
+    # 输出管道可能仍被残留的子进程占用，不无限等待 - Orphaned grandchildren may still hold the pipe open
+    reader.join(5)
+    process.stdout.close()
+
+    error = None
+    if timed_out.is_set():
+        error = f"Build timeout (exceeded {timeout:g} seconds)"
+    elif process.returncode != 0:
+        error = f"Build exited with code {process.returncode}"
+
+    return BuildResult(
+        success=error is None,
+        exit_code=process.returncode,
+        wall_seconds=wall_seconds,
+        peak_rss_kb=peak_rss_kb,
+        log_tail="".join(tail)[-tail_limit:],
+        error=error,
+    )
+
+
+def request_rebuild(reason: str, slugs: Optional[List[str]] = None) -> Optional[BuildRecord]:
+    """
+    根据环境决定是否调度 Astro 重建 - Schedule an Astro rebuild if the environment needs one
+
+    Args:
+        reason: Why the build was requested
+        slugs: Post slugs involved in the change
+
+    Returns:
+        The queued build record, or None in development mode
+        (the Astro dev server picks up file changes by itself)
+    """
+    if settings.ENVIRONMENT != "production":
+        print("Development mode: Astro dev server will auto-detect file changes")
+        return None
+
+    return build_scheduler.schedule(reason, slugs)
+
+
+def resume_pending_builds() -> Optional[BuildRecord]:
+    """
+    启动时恢复未完成的构建 - Resume unfinished builds on startup
+
+    Returns:
+        The scheduled build record, or None in development mode or if nothing is pending
+    """
+    if settings.ENVIRONMENT != "production":
+        return None
+    return build_scheduler.resume()
+
+
+# Global build history store
+build_history = BuildHistoryStore(SessionLocal, limit=settings.BUILD_HISTORY_LIMIT)
+
+# Global build scheduler instance
+build_scheduler = BuildScheduler(
+    debounce_seconds=settings.BUILD_DEBOUNCE_SECONDS,
+    manifest=BuildManifest(Path(settings.BUILD_MANIFEST_PATH), Path(settings.ASTRO_CONTENT_PATH)),
+    history=build_history,
+)
+
+metrics.build_queue_depth.set_function(
+    lambda: {(status,): count for status, count in build_scheduler.queue_depth().items()}
+)
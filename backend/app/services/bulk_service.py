@@ -0,0 +1,186 @@
+"""
+文章批量导入导出服务 - Post bulk import/export service
+解析 tar/zip 归档或 NDJSON 流，并将文章目录流式打包为 tar.gz
+Parses tar/zip archives or NDJSON streams, and streams the posts directory as a tar.gz archive
+"""
+import io
+import json
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+import frontmatter
+from pydantic import ValidationError
+
+from ..core.config import settings
+from ..schemas.post import PostCreate
+from . import post_service
+
+
+class BulkImportError(Exception):
+    """Raised when an import payload is malformed or any post fails validation"""
+
+    def __init__(self, message: str, errors: List[Dict[str, str]] = None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+def parse_import(fileobj: BinaryIO, content_type: str) -> List[Dict[str, Any]]:
+    """
+    解析并校验批量导入数据 - Parse and validate a bulk import payload
+
+    功能说明：
+    - application/x-ndjson：每行一个 PostCreate JSON 对象，可带 slug 字段
+    - 其他类型按归档处理（zip 或 tar，可压缩），其中每个 .md 文件为一篇文章，文件名即 slug
+    - 所有文章都必须通过 PostCreate 校验，否则整批拒绝
+
+    Args:
+        fileobj: Seekable file holding the request body
+        content_type: Request Content-Type
+
+    Returns:
+        Validated post data dictionaries, each with its slug
+
+    Raises:
+        BulkImportError: If the payload can't be read or any post is invalid
+    """
+    if content_type.split(";")[0].strip().lower() in ("application/x-ndjson", "application/ndjson"):
+        items = _read_ndjson(fileobj)
+    else:
+        items = _read_archive(fileobj)
+
+    posts = []
+    errors = []
+    for name, raw in items:
+        try:
+            post_data = PostCreate.model_validate(raw).model_dump()
+        except ValidationError as e:
+            errors.append({"item": name, "error": "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+            )})
+            continue
+        # 清理slug，防止路径穿越和隐藏文件 - Sanitize the slug against path traversal and hidden files
+        slug = str(raw.get("slug") or "") or post_data["title"]
+        post_data["slug"] = post_service._generate_slug(slug).lstrip(".") or "untitled"
+        if post_data["slug"] in post_service.RESERVED_SLUGS:
+            errors.append({"item": name, "error": f"slug: '{post_data['slug']}' is reserved"})
+            continue
+        posts.append(post_data)
+
+    if errors:
+        raise BulkImportError(f"{len(errors)} of {len(items)} posts failed validation", errors)
+    if not posts:
+        raise BulkImportError("No posts found in the upload")
+    return posts
+
+
+def _read_ndjson(fileobj: BinaryIO) -> List[Tuple[str, Dict[str, Any]]]:
+    """Read one JSON object per line (blank lines ignored)"""
+    items = []
+    for line_no, line in enumerate(io.TextIOWrapper(fileobj, encoding="utf-8"), start=1):
+        if not line.strip():
+            continue
+        try:
+            raw = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise BulkImportError(f"Invalid JSON on line {line_no}: {e}")
+        if not isinstance(raw, dict):
+            raise BulkImportError(f"Line {line_no} is not a JSON object")
+        items.append((f"line {line_no}", raw))
+    return items
+
+
+def _read_archive(fileobj: BinaryIO) -> List[Tuple[str, Dict[str, Any]]]:
+    """Read every .md member of a zip or tar archive as frontmatter + content"""
+    items = []
+    total = 0
+    try:
+        if zipfile.is_zipfile(fileobj):
+            fileobj.seek(0)
+            with zipfile.ZipFile(fileobj) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir() and info.filename.endswith(".md"):
+                        total += info.file_size
+                        _check_size(info.filename, total)
+                        with archive.open(info) as member:
+                            items.append(_parse_markdown(info.filename, member.read()))
+        else:
+            fileobj.seek(0)
+            with tarfile.open(fileobj=fileobj, mode="r:*") as archive:
+                for info in archive:
+                    if info.isfile() and info.name.endswith(".md"):
+                        total += info.size
+                        _check_size(info.name, total)
+                        member = archive.extractfile(info)
+                        items.append(_parse_markdown(info.name, member.read()))
+    except (tarfile.TarError, zipfile.BadZipFile, EOFError, OSError) as e:
+        raise BulkImportError(f"Unreadable archive: {e}")
+    return items
+
+
+def _check_size(name: str, total: int) -> None:
+    """Reject archives whose members decompress past the import limit"""
+    if total > settings.BULK_IMPORT_MAX_BYTES:
+        raise BulkImportError(f"Archive exceeds the {settings.BULK_IMPORT_MAX_BYTES} byte import limit at {name}")
+
+
+def _parse_markdown(name: str, data: bytes) -> Tuple[str, Dict[str, Any]]:
+    """Turn one Markdown file into PostCreate input; the filename becomes the slug"""
+    try:
+        post = frontmatter.loads(data.decode("utf-8"))
+    except Exception as e:
+        raise BulkImportError(f"Cannot parse {name}: {e}")
+    return name, {**post.metadata, "content": post.content, "slug": PurePosixPath(name).stem}
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only sink that hands out what was written since the last drain"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def export_archive() -> Iterator[bytes]:
+    """
+    流式导出所有文章为 tar.gz - Stream all posts as a tar.gz archive
+
+    功能说明：
+    - 逐个文件压缩并立即输出，内存中最多只保留一篇文章的压缩数据
+    - 文件按打开时的内容打包，导出过程中的原子替换不会产生不一致的条目
+
+    Yields:
+        Chunks of the gzip-compressed tar stream
+    """
+    posts_dir = Path(settings.ASTRO_CONTENT_PATH)
+    buffer = _ChunkBuffer()
+
+    with tarfile.open(fileobj=buffer, mode="w|gz") as archive:
+        for md_file in sorted(posts_dir.glob("*.md")):
+            try:
+                f = open(md_file, "rb")
+            except FileNotFoundError:
+                continue  # deleted since the directory listing
+            with f:
+                # 按已打开文件的 fstat 生成条目，保证大小与内容一致 - Size from fstat of the open file
+                info = archive.gettarinfo(arcname=md_file.name, fileobj=f)
+                info.uid = info.gid = 0
+                info.uname = info.gname = ""
+                archive.addfile(info, f)
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+
+    yield buffer.drain()
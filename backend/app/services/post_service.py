@@ -1,15 +1,453 @@
 """
 文章管理业务逻辑服务 - Article management business logic service
-处理Markdown文件的CRUD操作和Astro项目重新构建 - Handles CRUD operations for Markdown files and Astro project rebuilding
+处理Markdown文件的CRUD操作，重建由 build_service 调度 - Handles CRUD operations for Markdown files; rebuilds are scheduled by build_service
 """
+import base64
+import bisect
+import hashlib
+import json
 import os
-import subprocess
+import re
+import stat
+import tempfile
+import threading
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import frontmatter
-from datetime import datetime
+from frontmatter.default_handlers import YAMLHandler
+from datetime import datetime, date, timedelta
 
+from ..core import metrics
 from ..core.config import settings
+from .reading_stats import compute_reading_metadata
+from .search_service import search_index
+
+# 与 python-frontmatter 相同的分隔符规则和YAML解析器 - Same delimiter rule and YAML loader as python-frontmatter
+_yaml_handler = YAMLHandler()
+_FM_BOUNDARY = re.compile(r"^-{3,}\s*$")
+
+
+@dataclass
+class _IndexEntry:
+    """Cached frontmatter of one Markdown file, keyed by its stat signature"""
+    mtime_ns: int
+    size: int
+    metadata: Optional[Dict[str, Any]]  # None if the file failed to parse
+
+
+# 可用的服务端排序字段及其排序键 - Server-side sort fields and their sort keys
+# 每个键都以slug结尾，保证排序稳定且可作为分页游标 - Every key ends with the slug so it is total and usable as a cursor
+SORT_KEYS = {
+    "published": lambda m: (_date_key(m.get('published')), m['slug']),
+    "title": lambda m: (str(m.get('title') or '').lower(), m['slug']),
+    "slug": lambda m: (m['slug'],),
+}
+
+# 与 /posts/search、/posts/export、/posts/bulk 路由同名的slug，不能用于新文章
+# Slugs that clash with the /posts/search, /posts/export and /posts/bulk routes; new posts can't use them
+RESERVED_SLUGS = frozenset({"search", "export", "bulk"})
+
+# 由文件名或正文派生、不应从请求数据写入frontmatter的字段
+# Keys derived from the filename or body; never copied from request data into the frontmatter
+_DERIVED_KEYS = ('content', 'slug', 'readingMetadata')
+
+
+class PostMetadataIndex:
+    """
+    进程级文章元数据索引 - Process-wide post metadata index
+
+    功能说明：
+    - 以slug为键缓存 (mtime, size, 解析后的元数据)
+    - 列表请求只对 mtime/size 发生变化的文件重新解析
+    - 文章增删改时由 post_service 原地更新
+    - 预先计算各排序字段的有序视图和分类/标签倒排表，用于分页和过滤
+
+    Rules:
+    - A file is re-parsed only when its mtime or size changed
+    - Files that fail to parse are remembered so they are not retried until they change
+    - Sorted views, category/tag/draft facets and per-filter totals are cached until the index changes
+    - A page scans from the cursor and stops one match past `limit`
+    - While `watched` is set, a directory watcher keeps the index current
+      and listings skip the directory scan
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, _IndexEntry] = {}
+        self.watched = False
+        self._views: Dict[str, Tuple[List[tuple], List[Dict[str, Any]]]] = {}
+        self._facets: Optional[Dict[str, Dict[Any, set]]] = None
+        self._counts: Dict[tuple, int] = {}
+        self._fingerprint: Optional[str] = None
+        self._lock = threading.RLock()
+
+    def sync(self, posts_dir: Path) -> None:
+        """Reconcile the index with the directory, re-parsing only changed files"""
+        seen = set()
+
+        with self._lock, metrics.posts_scan_duration.time():
+            if posts_dir.exists():
+                with os.scandir(posts_dir) as it:
+                    for dir_entry in it:
+                        if not dir_entry.name.endswith(".md") or not dir_entry.is_file():
+                            continue
+                        slug = dir_entry.name[:-3]
+                        seen.add(slug)
+                        self._refresh(slug, Path(dir_entry.path), dir_entry.stat())
+
+            for slug in [s for s in self.entries if s not in seen]:
+                self.remove(slug)
+
+    def refresh(self, md_file: Path) -> None:
+        """Update the entry of a single file after it was written"""
+        with self._lock:
+            try:
+                stat_result = md_file.stat()
+            except FileNotFoundError:
+                self.remove(md_file.stem)
+                return
+            self._refresh(md_file.stem, md_file, stat_result)
+
+    def remove(self, slug: str) -> None:
+        """Drop a slug from the index"""
+        with self._lock:
+            if self.entries.pop(slug, None) is not None:
+                self._invalidate()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, slug: str) -> Optional[Dict[str, Any]]:
+        """Metadata copy of one post, or None if not indexed"""
+        with self._lock:
+            entry = self.entries.get(slug)
+            if entry is None or entry.metadata is None:
+                return None
+            return dict(entry.metadata)
+
+    def list_posts(self) -> List[Dict[str, Any]]:
+        """All parsed posts' metadata, newest first"""
+        posts, _, _ = self.query()
+        return posts
+
+    def query(
+        self,
+        first_level_category: Optional[str] = None,
+        second_level_category: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        draft: Optional[bool] = None,
+        published_from: Optional[date] = None,
+        published_to: Optional[date] = None,
+        sort: str = "published",
+        order: str = "desc",
+        limit: Optional[int] = None,
+        cursor: Optional[tuple] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[tuple], int]:
+        """
+        过滤、排序并分页查询文章元数据 - Filter, sort and paginate post metadata
+
+        Args:
+            first_level_category / second_level_category: Exact category match
+            tags: Posts must carry all of these tags
+            draft: Match draft status if given
+            published_from / published_to: Inclusive publication date range
+            sort: One of SORT_KEYS
+            order: "asc" or "desc"
+            limit: Page size, None for everything
+            cursor: Sort key of the last item of the previous page
+
+        Returns:
+            (page of metadata copies, cursor for the next page or None,
+             total matches of the filters across all pages)
+        """
+        with self._lock:
+            keys, posts = self._view(sort)
+            facets = self._facet_index()
+
+            # 用倒排表求候选集合（草稿状态也是倒排表）- Candidate slugs from the inverted facets (draft status included)
+            allowed = None
+            wanted = [("first_level_category", first_level_category),
+                      ("second_level_category", second_level_category),
+                      ("draft", draft)]
+            wanted += [("tags", tag) for tag in sorted(set(tags or []))]
+            for facet, value in wanted:
+                if value is None:
+                    continue
+                slugs = facets[facet].get(value, set())
+                allowed = slugs if allowed is None else allowed & slugs
+
+            # 总数与排序和游标无关，按过滤条件缓存 - The total doesn't depend on sort or cursor; cached per filter tuple
+            count_key = (tuple(wanted), published_from, published_to)
+            total = self._counts.get(count_key)
+            if total is None:
+                total = self._count(allowed, published_from, published_to)
+                if len(self._counts) >= 256:
+                    self._counts.clear()
+                self._counts[count_key] = total
+
+            # 按发布日期排序时，日期范围直接二分定位 - Date ranges narrow the view by bisection when sorted by date
+            lo, hi = 0, len(keys)
+            if sort == "published":
+                lo, hi = _date_bounds(keys, published_from, published_to)
+
+            # 从游标之后开始扫描 - Start scanning right after the cursor
+            if cursor is not None:
+                if order == "asc":
+                    lo = max(lo, bisect.bisect_right(keys, cursor))
+                else:
+                    hi = min(hi, bisect.bisect_left(keys, cursor))
+
+            indices = range(lo, hi) if order == "asc" else range(hi - 1, lo - 1, -1)
+
+            page: List[Dict[str, Any]] = []
+            next_cursor = None
+            for i in indices:
+                metadata = posts[i]
+                if allowed is not None and metadata['slug'] not in allowed:
+                    continue
+                if sort != "published" and not _in_date_range(metadata, published_from, published_to):
+                    continue
+
+                if limit is not None and len(page) == limit:
+                    # 还有下一条匹配，说明存在下一页 - One more match exists, so there is a next page
+                    next_cursor = SORT_KEYS[sort](page[-1])
+                    break
+                # 返回副本，防止调用方修改缓存 - Return copies so callers cannot mutate the cache
+                page.append(dict(metadata))
+
+            return page, next_cursor, total
+
+    def _count(self, allowed: Optional[set], published_from: Optional[date], published_to: Optional[date]) -> int:
+        """Number of posts in `allowed` (None for all) within the date range (caller holds the lock)"""
+        if published_from is None and published_to is None:
+            return len(allowed) if allowed is not None else len(self._view("published")[0])
+
+        keys, posts = self._view("published")
+        lo, hi = _date_bounds(keys, published_from, published_to)
+        if allowed is None:
+            return max(0, hi - lo)
+        # 遍历较小的一边 - Walk whichever side is smaller
+        if len(allowed) < hi - lo:
+            return sum(
+                1 for slug in allowed
+                if _in_date_range(self.entries[slug].metadata, published_from, published_to)
+            )
+        return sum(1 for i in range(lo, hi) if posts[i]['slug'] in allowed)
+
+    def fingerprint(self) -> str:
+        """
+        索引内容指纹 - Fingerprint of the indexed files
+
+        Returns:
+            Hex digest over every slug's mtime and size
+        """
+        with self._lock:
+            if self._fingerprint is None:
+                digest = hashlib.sha1()
+                for slug in sorted(self.entries):
+                    entry = self.entries[slug]
+                    digest.update(f"{slug}\0{entry.mtime_ns}\0{entry.size}\n".encode('utf-8'))
+                self._fingerprint = digest.hexdigest()
+            return self._fingerprint
+
+    def _view(self, sort: str) -> Tuple[List[tuple], List[Dict[str, Any]]]:
+        """Posts sorted ascending by SORT_KEYS[sort], with their keys (caller holds the lock)"""
+        view = self._views.get(sort)
+        if view is None:
+            key_func = SORT_KEYS[sort]
+            decorated = sorted(
+                ((key_func(e.metadata), e.metadata)
+                 for e in self.entries.values() if e.metadata is not None),
+                key=lambda pair: pair[0],
+            )
+            view = ([k for k, _ in decorated], [m for _, m in decorated])
+            self._views[sort] = view
+        return view
+
+    def _facet_index(self) -> Dict[str, Dict[Any, set]]:
+        """Inverted maps from category/tag values and draft status to slugs (caller holds the lock)"""
+        if self._facets is None:
+            facets: Dict[str, Dict[Any, set]] = {
+                "first_level_category": {}, "second_level_category": {}, "tags": {}, "draft": {}
+            }
+            for entry in self.entries.values():
+                metadata = entry.metadata
+                if metadata is None:
+                    continue
+                for facet in ("first_level_category", "second_level_category"):
+                    value = metadata.get(facet)
+                    if isinstance(value, str):
+                        facets[facet].setdefault(value, set()).add(metadata['slug'])
+                for tag in metadata.get('tags') or []:
+                    facets["tags"].setdefault(str(tag), set()).add(metadata['slug'])
+                facets["draft"].setdefault(bool(metadata.get('draft') or False), set()).add(metadata['slug'])
+            self._facets = facets
+        return self._facets
+
+    def _invalidate(self) -> None:
+        self._views = {}
+        self._facets = None
+        self._counts = {}
+        self._fingerprint = None
+
+    def _refresh(self, slug: str, md_file: Path, stat_result: os.stat_result) -> None:
+        entry = self.entries.get(slug)
+        if entry and entry.mtime_ns == stat_result.st_mtime_ns and entry.size == stat_result.st_size:
+            return
+
+        with metrics.frontmatter_parse_duration.time():
+            metadata = _load_metadata(md_file)
+        metrics.posts_reparsed.inc()
+
+        self.entries[slug] = _IndexEntry(
+            mtime_ns=stat_result.st_mtime_ns,
+            size=stat_result.st_size,
+            metadata=metadata,
+        )
+        self._invalidate()
+
+
+def _date_key(value: Any) -> str:
+    """Comparable ISO string for a published value (date, datetime or missing)"""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return ""
+
+
+def _date_bounds(keys: List[tuple], start: Optional[date], end: Optional[date]) -> Tuple[int, int]:
+    """Slice of a published-sorted key list inside an inclusive date range"""
+    lo, hi = 0, len(keys)
+    if start is not None:
+        lo = bisect.bisect_left(keys, (start.isoformat(),))
+    if end is not None:
+        hi = bisect.bisect_left(keys, (_date_key(end + timedelta(days=1)),))
+    return lo, hi
+
+
+def _in_date_range(metadata: Dict[str, Any], start: Optional[date], end: Optional[date]) -> bool:
+    key = _date_key(metadata.get('published'))
+    if start is not None and key < start.isoformat():
+        return False
+    if end is not None and key > end.isoformat():
+        return False
+    return True
+
+
+def encode_cursor(key: tuple) -> str:
+    """Encode a sort key as an opaque pagination cursor"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Decode a pagination cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(key, list) or not all(isinstance(part, str) for part in key):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return tuple(key)
+
+
+def _load_metadata(md_file: Path) -> Optional[Dict[str, Any]]:
+    """
+    解析单个文件的frontmatter元数据 - Parse the frontmatter metadata of a single file
+
+    Returns:
+        Metadata dictionary including slug, or None if the file cannot be parsed
+    """
+    try:
+        # 只读取frontmatter头部；格式异常时回退到完整解析 - Read only the header; fall back to the full parser on malformed files
+        try:
+            header = _read_frontmatter_header(md_file)
+        except Exception:
+            header = None
+
+        # 缺少 readingMetadata 的旧文章不在这里补算，避免列表读取全文；下次保存时写入
+        # Legacy posts without readingMetadata are not counted here (that would read every body);
+        # the next save writes it, and get_post_by_slug computes it on demand
+        if header is None:
+            with open(md_file, 'r', encoding='utf-8') as f:
+                header = frontmatter.load(f).metadata
+
+        # 提取slug（文件名，不包含扩展名） - Extract slug (filename without extension)
+        slug = md_file.stem
+
+        # Build metadata dictionary with proper date conversion
+        metadata = {
+            "slug": slug,
+            **header  # Expand all frontmatter data
+        }
+
+        # 确保published字段是Date对象 - Ensure published field is Date object
+        if 'published' in metadata:
+            published = metadata['published']
+            if isinstance(published, str):
+                # 如果是字符串，尝试解析为日期
+                try:
+                    metadata['published'] = datetime.strptime(published, '%Y-%m-%d').date()
+                except ValueError:
+                    # 如果解析失败，使用当前日期
+                    metadata['published'] = datetime.now().date()
+            elif not isinstance(published, (datetime, type(datetime.now().date()))):
+                # 如果不是日期类型，使用当前日期
+                metadata['published'] = datetime.now().date()
+
+        return metadata
+
+    except Exception as e:
+        print(f"Error reading file {md_file}: {e}")
+        return None
+
+
+def _read_frontmatter_header(md_file: Path) -> Dict[str, Any]:
+    """
+    流式读取frontmatter头部 - Stream only the frontmatter header of a Markdown file
+
+    功能说明：
+    - 逐行读取，遇到结束分隔符 --- 即停止，不读取文章正文
+    - 仅对头部进行YAML解析
+
+    Returns:
+        Parsed frontmatter dictionary
+
+    Raises:
+        ValueError: If the file has no well-formed frontmatter block
+            (callers fall back to frontmatter.load in that case)
+    """
+    with open(md_file, 'r', encoding='utf-8') as f:
+        if not _FM_BOUNDARY.match(f.readline()):
+            raise ValueError(f"{md_file} does not start with a frontmatter delimiter")
+
+        header_lines = []
+        for line in f:
+            if _FM_BOUNDARY.match(line):
+                break
+            header_lines.append(line)
+        else:
+            raise ValueError(f"{md_file} has no closing frontmatter delimiter")
+
+    metadata = _yaml_handler.load("".join(header_lines))
+    if metadata is None:
+        return {}
+    if not isinstance(metadata, dict):
+        raise ValueError(f"{md_file} frontmatter is not a mapping")
+    return metadata
+
+
+# Global post metadata index instance
+post_index = PostMetadataIndex()
+
+# 抓取时统计，监听器增量更新时也保持准确 - Counted at scrape time, so it stays right under incremental watcher updates
+metrics.posts_scan_files.set_function(lambda: len(post_index))
 
 
 def get_all_posts_metadata() -> List[Dict[str, Any]]:
@@ -17,67 +455,105 @@ def get_all_posts_metadata() -> List[Dict[str, Any]]:
     获取所有文章元数据（不包含正文内容） - Get metadata of all articles (without content body)
 
     功能说明：
-    - 遍历所有markdown文件，仅读取frontmatter元数据
-    - 不读取文章正文内容，提高性能，减少内存占用
+    - 从进程级元数据索引返回结果，只重新解析发生变化的文件
     - 用于管理面板文章列表显示
 
     Returns:
         List of article metadata, each element contains frontmatter data and slug
 
     Note:
-        Only reads frontmatter, not content body, for article list display
-        Better performance, reduces memory usage
+        Without the directory watcher each call stats the directory; files are
+        re-parsed only when their mtime or size changed since the last call.
+        With the watcher running the index is served as-is.
     """
-    posts_metadata = []
-    posts_dir = Path(settings.ASTRO_CONTENT_PATH)
+    if not post_index.watched:
+        post_index.sync(Path(settings.ASTRO_CONTENT_PATH))
+    return post_index.list_posts()
 
-    # 确保文章目录存在 - Ensure posts directory exists
-    if not posts_dir.exists():
-        return posts_metadata
 
-    # 遍历所有.md文件 - Iterate through all .md files
-    for md_file in posts_dir.glob("*.md"):
-        try:
-            # 读取文件内容 - Read file content
-            with open(md_file, 'r', encoding='utf-8') as f:
-                post = frontmatter.load(f)
+def query_posts_metadata(sync: bool = True, **filters: Any) -> Tuple[List[Dict[str, Any]], Optional[tuple], int]:
+    """
+    过滤、排序并分页查询文章元数据 - Filter, sort and paginate post metadata
+
+    功能说明：
+    - 与 get_all_posts_metadata 相同的索引同步策略
+    - 查询由预先计算的有序视图和倒排表回答，不扫描文件
 
-            # 提取slug（文件名，不包含扩展名） - Extract slug (filename without extension)
-            slug = md_file.stem
+    Args:
+        sync: Reconcile the index with the directory first (skip if the caller just did)
+        **filters: Keyword arguments accepted by PostMetadataIndex.query
 
-            # Build metadata dictionary with proper date conversion
-            metadata = {
-                "slug": slug,
-                **post.metadata  # Expand all frontmatter data
-            }
+    Returns:
+        (page of metadata, cursor key for the next page or None, total matches)
+    """
+    if sync and not post_index.watched:
+        post_index.sync(Path(settings.ASTRO_CONTENT_PATH))
+    return post_index.query(**filters)
 
-            # 确保published字段是Date对象 - Ensure published field is Date object
-            if 'published' in metadata:
-                published = metadata['published']
-                if isinstance(published, str):
-                    # 如果是字符串，尝试解析为日期
-                    try:
-                        metadata['published'] = datetime.strptime(published, '%Y-%m-%d').date()
-                    except ValueError:
-                        # 如果解析失败，使用当前日期
-                        metadata['published'] = datetime.now().date()
-                elif not isinstance(published, (datetime, type(datetime.now().date()))):
-                    # 如果不是日期类型，使用当前日期
-                    metadata['published'] = datetime.now().date()
 
-            posts_metadata.append(metadata)
+def search_posts(query: str, limit: int = 20, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    全文搜索文章 - Full-text search over posts
 
-        except Exception as e:
-            print(f"Error reading file {md_file}: {e}")
-            continue
+    功能说明：
+    - 搜索标题、描述、标签和正文（包括草稿），按相关度排序
+    - 搜索索引由增删改接口和目录监听器维护；未启用监听时才在搜索前同步目录
+    - 从元数据索引中取出结果的元数据
 
-    # Sort by publication date in descending order (newest first)
-    posts_metadata.sort(
-        key=lambda x: x.get('published', datetime.min.date()),
-        reverse=True
-    )
+    Args:
+        query: Search text (Chinese and other CJK text supported)
+        limit: Page size
+        offset: Number of results to skip
 
-    return posts_metadata
+    Returns:
+        (page of metadata ordered by relevance, total matches)
+    """
+    if not post_index.watched:
+        posts_dir = Path(settings.ASTRO_CONTENT_PATH)
+        post_index.sync(posts_dir)
+        search_index.sync(posts_dir)
+
+    slugs, total = search_index.search(query, limit=limit, offset=offset)
+    results = [post_index.get(slug) for slug in slugs]
+    return [metadata for metadata in results if metadata is not None], total
+
+
+def get_posts_list_validators() -> str:
+    """
+    获取文章列表的缓存校验值 - Get cache validators for the posts listing
+
+    功能说明：
+    - 只比较文件的 mtime/size，不解析YAML
+    - 用于 ETag 条件请求（列表不提供 Last-Modified）
+
+    Returns:
+        Fingerprint of all post files
+
+    Note:
+        There is no Last-Modified for the listing: deleting a post or copying in a file
+        with an old mtime changes the list without producing a newer timestamp
+    """
+    if not post_index.watched:
+        post_index.sync(Path(settings.ASTRO_CONTENT_PATH))
+    return post_index.fingerprint()
+
+
+def get_post_validators(slug: str) -> Optional[Tuple[str, float]]:
+    """
+    获取单篇文章的缓存校验值 - Get cache validators for a single post
+
+    Args:
+        slug: Article identifier
+
+    Returns:
+        (strong ETag built from mtime and size, mtime in seconds), or None if the post doesn't exist
+    """
+    md_file = Path(settings.ASTRO_CONTENT_PATH) / f"{slug}.md"
+    try:
+        stat_result = md_file.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"', stat_result.st_mtime
 
 
 def get_post_by_slug(slug: str) -> Optional[Dict[str, Any]]:
@@ -120,6 +596,10 @@ def get_post_by_slug(slug: str) -> Optional[Dict[str, Any]]:
             **post.metadata
         }
 
+        # 旧文章缺少阅读统计时按已读取的正文计算 - Count legacy posts from the body already read
+        if not isinstance(result.get('readingMetadata'), dict):
+            result['readingMetadata'] = compute_reading_metadata(post.content)
+
         if 'published' in result:
             published = result['published']
             if isinstance(published, str):
@@ -137,6 +617,136 @@ def get_post_by_slug(slug: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+class _SlugLockEntry:
+    """Re-entrant lock for one slug plus the number of threads holding or waiting for it"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.users = 0
+
+
+_slug_locks: Dict[str, _SlugLockEntry] = {}
+_slug_locks_guard = threading.Lock()
+
+
+@contextmanager
+def slug_lock(slug: str):
+    """
+    单篇文章的写锁 - Per-slug write lock
+
+    功能说明：
+    - 同一slug的读取-合并-写入操作串行执行，不同slug之间互不阻塞
+    - 可重入：路由持有锁时仍可调用 update_post
+    - 无人使用的锁会被回收，锁表不会无限增长
+
+    Usage:
+        with post_service.slug_lock(slug):
+            ...  # read, merge and write the post
+    """
+    with _slug_locks_guard:
+        entry = _slug_locks.get(slug)
+        if entry is None:
+            entry = _slug_locks[slug] = _SlugLockEntry()
+        entry.users += 1
+
+    try:
+        with entry.lock:
+            yield
+    finally:
+        with _slug_locks_guard:
+            entry.users -= 1
+            if entry.users == 0:
+                del _slug_locks[slug]
+
+
+def _atomic_write(md_file: Path, text: str) -> None:
+    """
+    原子写入文件 - Atomically replace a file's content
+
+    功能说明：
+    - 先写入同目录下的临时文件，再通过 os.replace 替换目标文件
+    - 并发读取者和 Astro 构建只会看到旧文件或完整的新文件，不会看到写了一半的文件
+    - POST_FSYNC 开启时，替换前后分别 fsync 文件和目录，保证断电后数据完整
+
+    Note:
+        The temp file is a dotfile without the .md suffix, so the metadata
+        index, the directory watcher and Astro's glob all ignore it
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=md_file.parent, prefix=f".{md_file.name}.", suffix=".tmp")
+    try:
+        # mkstemp 创建的文件权限为0600，保持与原文件一致 - mkstemp creates 0600 files; keep the original mode
+        try:
+            mode = stat.S_IMODE(md_file.stat().st_mode)
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            if settings.POST_FSYNC:
+                f.flush()
+                os.fsync(f.fileno())
+
+        os.replace(tmp_path, md_file)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    if settings.POST_FSYNC and hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(md_file.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _update_search_index(md_file: Path, metadata: Dict[str, Any], content: str) -> None:
+    """更新全文搜索索引，失败不影响文章保存 - Update the search index; failures never fail the save"""
+    try:
+        search_index.update(md_file, metadata, content)
+    except Exception as e:
+        print(f"Error indexing article {md_file.stem} for search: {e}")
+
+
+def _render_post(post_data: Dict[str, Any]) -> Tuple[Dict[str, Any], str, str]:
+    """
+    将文章数据序列化为 Markdown 文本 - Serialize new-post data to Markdown text
+
+    Returns:
+        (frontmatter data, body content, full Markdown text)
+    """
+    content = post_data.get('content', '').strip()
+
+    # 准备前言数据,过滤掉 None 值以避免 Zod 校验错误--Prepare frontmatter data, filter out None values to avoid Zod validation errors
+    frontmatter_data = {k: v for k, v in post_data.items() if k not in ('content', 'slug') and v is not None}
+
+    # 确保发布日期存在且格式正确--Ensure publication date exists and is properly formatted
+    if 'published' not in frontmatter_data:
+        frontmatter_data['published'] = datetime.now().date()
+    else:
+        # 将日期转换为前置内容的日期对象(不是字符串)--Convert date to date object for frontmatter (not string!)
+        published = frontmatter_data['published']
+        if isinstance(published, str):
+            try:
+                frontmatter_data['published'] = datetime.strptime(published, '%Y-%m-%d').date()
+            except ValueError:
+                frontmatter_data['published'] = datetime.now().date()
+        elif hasattr(published, 'strftime'):
+            pass
+        else:
+            frontmatter_data['published'] = datetime.now().date()
+
+    # 写入时预先计算字数和阅读时间 - Precompute word count and reading time at write time
+    frontmatter_data['readingMetadata'] = compute_reading_metadata(content)
+
+    post = frontmatter.Post(content)
+    post.metadata = frontmatter_data
+    return frontmatter_data, content, frontmatter.dumps(post)
+
+
 def create_post(post_data: Dict[str, Any]) -> bool:
     """
     创建新文章
@@ -150,8 +760,7 @@ def create_post(post_data: Dict[str, Any]) -> bool:
     流程：
         1. 根据标题生成 URL 友好的 slug
         2. 构建完整的 Markdown 内容（frontmatter + 内容）
-        3. 写入文件
-        4. 触发 Astro 重建
+        3. 原子写入文件（临时文件 + os.replace）
     Create new article
 
     Args:
@@ -163,13 +772,11 @@ def create_post(post_data: Dict[str, Any]) -> bool:
     Process:
         1. Generate URL-friendly slug from title
         2. Build complete Markdown content (frontmatter + content)
-        3. Write to file
-        4. Trigger Astro rebuild
+        3. Write to file atomically (temp file + os.replace)
     """
     try:
         # 提取必填字段--Extract required fields
         title = post_data.get('title', '').strip()
-        content = post_data.get('content', '').strip()
 
         if not title:
             print("Error: Article title cannot be empty")
@@ -178,43 +785,19 @@ def create_post(post_data: Dict[str, Any]) -> bool:
         # 生成 slug（使用标题作为文件名，替换特殊字符）--Generate slug (use title as filename, replace special characters)
         slug = _generate_slug(title)
 
-        # 准备前言数据,过滤掉 None 值以避免 Zod 校验错误--Prepare frontmatter data, filter out None values to avoid Zod validation errors
-        frontmatter_data = {k: v for k, v in post_data.items() if k != 'content' and v is not None}
-
-        # 确保发布日期存在且格式正确--Ensure publication date exists and is properly formatted
-        if 'published' not in frontmatter_data:
-            frontmatter_data['published'] = datetime.now().date()
-        else:
-            # 将日期转换为前置内容的日期对象(不是字符串)--Convert date to date object for frontmatter (not string!)
-            published = frontmatter_data['published']
-            if isinstance(published, str):
-                try:
-                    frontmatter_data['published'] = datetime.strptime(published, '%Y-%m-%d').date()
-                except ValueError:
-                    frontmatter_data['published'] = datetime.now().date()
-            elif hasattr(published, 'strftime'):
-                pass
-            else:
-                frontmatter_data['published'] = datetime.now().date()
-        post = frontmatter.Post(content)
-        post.metadata = frontmatter_data
+        frontmatter_data, content, text = _render_post(post_data)
 
         posts_dir = Path(settings.ASTRO_CONTENT_PATH)
         posts_dir.mkdir(parents=True, exist_ok=True)
 
         md_file = posts_dir / f"{slug}.md"
 
-        with open(md_file, 'w', encoding='utf-8') as f:
-            f.write(frontmatter.dumps(post))
-
+        with slug_lock(slug):
+            _atomic_write(md_file, text)
+            post_index.refresh(md_file)
+            _update_search_index(md_file, frontmatter_data, content)
         print(f"Article created successfully: {md_file}")
 
-        # 根据环境决定是否触发 Astro rebuild
-        if settings.ENVIRONMENT == "production":
-            trigger_astro_rebuild()
-        else:
-            print("Development mode: Astro dev server will auto-detect file changes")
-
         return True
 
     except Exception as e:
@@ -222,7 +805,14 @@ def create_post(post_data: Dict[str, Any]) -> bool:
         return False
 
 
-def update_post(slug: str, post_data: Dict[str, Any]) -> bool:
+@dataclass
+class UpdateResult:
+    """Outcome of update_post"""
+    success: bool
+    changed: bool = False  # False when the serialized post was identical to the file on disk
+
+
+def update_post(slug: str, post_data: Dict[str, Any]) -> UpdateResult:
     """
     更新现有文章
 
@@ -231,7 +821,9 @@ def update_post(slug: str, post_data: Dict[str, Any]) -> bool:
     post_data：新文章数据
 
     返回：
-    更新成功返回 True，失败返回 False
+    UpdateResult：success 表示是否成功，changed 表示文件内容是否实际发生变化
+    新的frontmatter和正文与磁盘文件解析结果相同时，不写入文件
+
     Update existing article
 
     Args:
@@ -239,7 +831,8 @@ def update_post(slug: str, post_data: Dict[str, Any]) -> bool:
         post_data: New article data
 
     Returns:
-        True if update successful, False if failed
+        UpdateResult with success, and changed=False when the new frontmatter and body
+        equal what is on disk after parsing (nothing is written then)
     """
     try:
         posts_dir = Path(settings.ASTRO_CONTENT_PATH)
@@ -247,12 +840,12 @@ def update_post(slug: str, post_data: Dict[str, Any]) -> bool:
 
         if not md_file.exists():
             print(f"Error: Article {slug} does not exist")
-            return False
+            return UpdateResult(success=False)
 
         # 提取内容--Extract content
         content = post_data.get('content', '').strip()
         # 过滤掉 None 值以避免 Zod 校验错误--Filter out None values to avoid Zod validation errors
-        frontmatter_data = {k: v for k, v in post_data.items() if k != 'content' and v is not None}
+        frontmatter_data = {k: v for k, v in post_data.items() if k not in _DERIVED_KEYS and v is not None}
 
         # 处理前置内容的日期转换--Handle date conversion for frontmatter
         if 'published' in frontmatter_data:
@@ -267,24 +860,131 @@ def update_post(slug: str, post_data: Dict[str, Any]) -> bool:
             else:
                 frontmatter_data['published'] = datetime.now().date()
 
+        # 正文可能已变化，重新计算阅读统计 - The body may have changed, recompute reading stats
+        frontmatter_data['readingMetadata'] = compute_reading_metadata(content)
+
         post = frontmatter.Post(content)
         post.metadata = frontmatter_data
 
-        with open(md_file, 'w', encoding='utf-8') as f:
-            f.write(frontmatter.dumps(post))
-
+        text = frontmatter.dumps(post)
+
+        with slug_lock(slug):
+            try:
+                with open(md_file, 'r', encoding='utf-8') as f:
+                    current = frontmatter.load(f)
+            except FileNotFoundError:
+                print(f"Error: Article {slug} does not exist")
+                return UpdateResult(success=False)
+            except Exception:
+                current = None  # unparseable file: overwrite it
+
+            # 按解析后的数据比较，不受YAML格式和键顺序影响 - Compare parsed data, so YAML formatting and key order don't matter
+            if current is not None and current.metadata == frontmatter_data and current.content.strip() == content:
+                print(f"Article unchanged, skipping write: {md_file}")
+                return UpdateResult(success=True, changed=False)
+
+            _atomic_write(md_file, text)
+            post_index.refresh(md_file)
+            _update_search_index(md_file, frontmatter_data, content)
         print(f"Article updated successfully: {md_file}")
 
-        if settings.ENVIRONMENT == "production":
-            trigger_astro_rebuild()
-        else:
-            print("Development mode: Astro dev server will auto-detect file changes")
-
-        return True
+        return UpdateResult(success=True, changed=True)
 
     except Exception as e:
         print(f"Error updating article {slug}: {e}")
-        return False
+        return UpdateResult(success=False)
+
+
+def patch_post(slug: str, changes: Dict[str, Any]) -> Optional[UpdateResult]:
+    """
+    部分更新文章 - Apply a partial update to a post
+
+    在slug锁内完成读取-合并-写入，避免并发更新互相覆盖
+    Reads, merges and writes under the slug lock so concurrent updates don't clobber each other
+
+    Args:
+        slug: Article identifier
+        changes: Fields to change (unset fields keep their current value)
+
+    Returns:
+        UpdateResult, or None if the article does not exist
+    """
+    with slug_lock(slug):
+        existing_post = get_post_by_slug(slug)
+        if not existing_post:
+            return None
+        current = {k: v for k, v in existing_post.items() if k not in ('slug', 'readingMetadata')}
+        return update_post(slug, {**current, **changes})
+
+
+def import_posts(posts: List[Dict[str, Any]], overwrite: bool = False) -> List[str]:
+    """
+    批量导入文章 - Import a batch of posts
+
+    功能说明：
+    - 每篇文章原子写入；任一文章写入失败时，已写入的文章全部恢复原状
+    - 按slug顺序获取所有文章的锁，避免与其他写操作死锁
+    - 调用方负责在导入后调度一次重建
+
+    Args:
+        posts: Validated post data; each item may carry a "slug", otherwise it is generated from the title
+        overwrite: Replace posts whose slug already exists
+
+    Returns:
+        Slugs written, in input order
+
+    Raises:
+        FileExistsError: If a slug already exists and overwrite is False (nothing is written)
+        ValueError: If two posts in the batch share a slug
+    """
+    posts_dir = Path(settings.ASTRO_CONTENT_PATH)
+    posts_dir.mkdir(parents=True, exist_ok=True)
+
+    rendered = []
+    for post_data in posts:
+        slug = post_data.get('slug') or _generate_slug(post_data.get('title', '').strip())
+        rendered.append((slug, *_render_post(post_data)))
+
+    slugs = [item[0] for item in rendered]
+    if len(set(slugs)) != len(slugs):
+        duplicates = sorted({slug for slug in slugs if slugs.count(slug) > 1})
+        raise ValueError(f"Duplicate slugs in batch: {', '.join(duplicates)}")
+
+    with ExitStack() as stack:
+        for slug in sorted(slugs):
+            stack.enter_context(slug_lock(slug))
+
+        if not overwrite:
+            existing = [slug for slug in slugs if (posts_dir / f"{slug}.md").exists()]
+            if existing:
+                raise FileExistsError(f"Posts already exist: {', '.join(existing)}")
+
+        # 记录原内容以便失败时回滚 - Remember previous content for rollback
+        written: List[Tuple[Path, Optional[str]]] = []
+        try:
+            for slug, frontmatter_data, content, text in rendered:
+                md_file = posts_dir / f"{slug}.md"
+                previous = md_file.read_text(encoding='utf-8') if md_file.exists() else None
+                _atomic_write(md_file, text)
+                written.append((md_file, previous))
+        except BaseException:
+            for md_file, previous in reversed(written):
+                try:
+                    if previous is None:
+                        os.remove(md_file)
+                    else:
+                        _atomic_write(md_file, previous)
+                except Exception as e:
+                    print(f"Error rolling back {md_file}: {e}")
+            raise
+
+        for slug, frontmatter_data, content, text in rendered:
+            md_file = posts_dir / f"{slug}.md"
+            post_index.refresh(md_file)
+            _update_search_index(md_file, frontmatter_data, content)
+
+    print(f"Imported {len(slugs)} articles")
+    return slugs
 
 
 def delete_post(slug: str) -> bool:
@@ -308,18 +1008,19 @@ def delete_post(slug: str) -> bool:
         posts_dir = Path(settings.ASTRO_CONTENT_PATH)
         md_file = posts_dir / f"{slug}.md"
 
-        if not md_file.exists():
-            print(f"Error: Article {slug} does not exist")
-            return False
-
-        os.remove(md_file)
+        with slug_lock(slug):
+            if not md_file.exists():
+                print(f"Error: Article {slug} does not exist")
+                return False
+
+            os.remove(md_file)
+            post_index.remove(slug)
+            try:
+                search_index.remove(slug)
+            except Exception as e:
+                print(f"Error removing article {slug} from search index: {e}")
         print(f"Article deleted successfully: {md_file}")
 
-        if settings.ENVIRONMENT == "production":
-            trigger_astro_rebuild()
-        else:
-            print("Development mode: Astro dev server will auto-detect file changes")
-
         return True
 
     except Exception as e:
@@ -327,54 +1028,6 @@ def delete_post(slug: str) -> bool:
         return False
 
 
-def trigger_astro_rebuild():
-    """
-    触发 Astro 项目重建
-
-    注意：
-    在 Astro 项目目录中执行 pnpm run build 命令
-    这是使文章更改生效的关键步骤
-    Trigger Astro project rebuild
-
-    Note:
-        Execute pnpm run build command in Astro project directory
-        This is the key step to make article changes take effect
-    """
-    try:
-        astro_project_path = Path(settings.ASTRO_PROJECT_PATH)
-
-        if not astro_project_path.exists():
-            print(f"Error: Astro project directory does not exist: {astro_project_path}")
-            return False
-
-        print(f"Starting Astro project rebuild: {astro_project_path}")
-
-        # 执行构建命令--Execute build command
-        result = subprocess.run(
-            ["pnpm", "run", "build"],
-            cwd=astro_project_path,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
-        )
-
-        if result.returncode == 0:
-            print("Astro project build successful")
-            print("Build output:", result.stdout)
-            return True
-        else:
-            print("Astro project build failed")
-            print("Error output:", result.stderr)
-            return False
-
-    except subprocess.TimeoutExpired:
-        print("Error: Build timeout (exceeded 5 minutes)")
-        return False
-    except Exception as e:
-        print(f"Error triggering build: {e}")
-        return False
-
-
 def _generate_slug(title: str) -> str:
     """
     根据标题生成 URL 友好的 slug
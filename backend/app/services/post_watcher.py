@@ -0,0 +1,136 @@
+"""
+文章目录监听服务 - Posts directory watcher service
+监听通过 git pull / rsync 等方式直接写入的Markdown文件，保持元数据索引实时更新
+Watches Markdown files dropped in via git pull / rsync and keeps the metadata index hot
+"""
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+from ..core.config import settings
+from .post_service import post_index
+from .search_service import search_index
+
+try:
+    # watchfiles 随 uvicorn[standard] 安装，基于 inotify - Installed with uvicorn[standard], inotify based
+    import watchfiles
+except ImportError:  # pragma: no cover - optional dependency
+    watchfiles = None
+
+
+class PostWatcher:
+    """
+    文章目录监听器 - Posts directory watcher
+
+    功能说明：
+    - 启动时完整同步一次元数据索引和搜索索引，之后只根据文件变更事件更新
+    - 优先使用 inotify（watchfiles），不可用或失败时回退到定时轮询
+    - 运行期间列表接口无需每次扫描目录
+
+    Modes:
+    - "auto": inotify if watchfiles is available, otherwise polling
+    - "inotify": inotify, falling back to polling if the watch cannot be set up
+    - "poll": stat the directory every `poll_interval` seconds
+    - "off": no watcher; listings and searches scan the directory on every request
+    """
+
+    def __init__(self, posts_dir: Path, mode: str = "auto", poll_interval: float = 2.0):
+        self.posts_dir = posts_dir
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        """Start watching in a background task (must be called from the event loop)"""
+        if self.mode == "off" or self._task is not None:
+            return
+        self._stop_event = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop watching; listings go back to scanning the directory"""
+        if self._task is None:
+            return
+        # 通知监听循环自行退出，超时才取消 - Let the watch loop exit on its own; cancel only on timeout
+        self._stop_event.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=5)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+        self._task = None
+        post_index.watched = False
+
+    async def _run(self) -> None:
+        # 初始完整同步；监听建立前请求仍自行同步 - Initial full sync; requests keep syncing themselves until the watch is up
+        await asyncio.to_thread(self._sync)
+
+        try:
+            if self.mode in ("auto", "inotify") and watchfiles is not None:
+                try:
+                    await self._watch_inotify()
+                    return
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"Posts watcher: inotify unavailable ({e}), falling back to polling")
+            await self._watch_poll()
+        finally:
+            post_index.watched = False
+
+    async def _watch_inotify(self) -> None:
+        print(f"Posts watcher: watching {self.posts_dir} with inotify")
+        async for changes in watchfiles.awatch(
+            self.posts_dir,
+            watch_filter=lambda change, path: path.endswith(".md"),
+            stop_event=self._stop_event,
+            recursive=False,
+            rust_timeout=1000,
+            yield_on_timeout=True,
+        ):
+            if not post_index.watched:
+                # 第一次返回时 inotify 监听已建立：再同步一次，补上初始同步之后写入的文件
+                # The first yield means the inotify watch is registered: reconcile once more to catch
+                # files written after the initial sync, then let requests rely on the watcher
+                await asyncio.to_thread(self._sync)
+                post_index.watched = True
+            elif changes:
+                await asyncio.to_thread(self._apply, changes)
+
+    async def _watch_poll(self) -> None:
+        print(f"Posts watcher: polling {self.posts_dir} every {self.poll_interval}s")
+        post_index.watched = True
+        while True:
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.poll_interval)
+                return
+            except asyncio.TimeoutError:
+                await asyncio.to_thread(self._sync)
+
+    def _sync(self) -> None:
+        """Reconcile the metadata and search indexes with the directory"""
+        post_index.sync(self.posts_dir)
+        search_index.sync(self.posts_dir)
+
+    @staticmethod
+    def _apply(changes) -> None:
+        """Push a batch of file change events into the indexes"""
+        for change, path in changes:
+            md_file = Path(path)
+            if change == watchfiles.Change.deleted:
+                post_index.remove(md_file.stem)
+            else:
+                post_index.refresh(md_file)
+            # 搜索索引失败不能中断监听 - A search index failure must not stop the watcher
+            try:
+                search_index.refresh(md_file)
+            except Exception as e:
+                print(f"Error updating search index for {md_file}: {e}")
+
+
+# Global posts watcher instance
+post_watcher = PostWatcher(
+    Path(settings.ASTRO_CONTENT_PATH),
+    mode=settings.POST_WATCHER_MODE,
+    poll_interval=settings.POST_WATCHER_POLL_INTERVAL,
+)
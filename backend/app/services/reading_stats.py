@@ -0,0 +1,86 @@
+"""
+文章阅读统计服务 - Post reading statistics service
+在写入文章时计算字数和预计阅读时间，存入 frontmatter 的 readingMetadata
+Computes word count and estimated reading time when a post is written,
+stored in the frontmatter as readingMetadata
+"""
+import math
+import re
+from typing import Dict
+
+# 阅读速度：中日文按字计，其余按词计 - Reading speed: Chinese/Japanese per character, everything else per word
+CJK_CHARS_PER_MINUTE = 300
+WORDS_PER_MINUTE = 200
+
+# 中日文按单字计数：假名、CJK统一表意文字（含扩展A）、兼容表意文字
+# Counted per character: kana, CJK unified ideographs (incl. extension A), compatibility ideographs
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+
+# 一次扫描同时匹配单个中日文字符和其他语言的单词 - One scan matches single CJK characters and other words
+_TOKEN = re.compile(rf"([{_CJK}])|[^\W_{_CJK}]+(?:['’.\-][^\W_{_CJK}]+)*")
+
+# 行内不计数的部分：行内代码、行内公式、HTML标签、图片、链接地址
+# Inline parts that are not counted: code spans, inline math, HTML tags, images, link targets
+_INLINE_SKIP = re.compile(
+    r"`[^`]*`"
+    r"|\$[^$\n]+\$"
+    r"|<[^>\n]*>"
+    r"|!\[[^\]]*\]\([^)]*\)"
+    r"|\]\([^)]*\)"
+)
+
+_FENCE = re.compile(r"^\s*(`{3,}|~{3,})")
+_MATH_BLOCK = re.compile(r"^\s*\$\$")
+
+
+def compute_reading_metadata(content: str) -> Dict[str, int]:
+    """
+    计算文章正文的字数和预计阅读时间 - Count words and estimate reading time of a post body
+
+    功能说明：
+    - 按行单次扫描，跳过代码块（``` / ~~~）和公式块（$$）
+    - 中日文每个字计为一个词，其余文本按单词计数
+    - 链接文字计入，标点不计入；前端 countWords 只用于没有 readingMetadata 的旧文章，
+      规则更粗略（删除整个链接、按空白切分、只识别基本汉字），两者结果可能略有差异
+
+    Args:
+        content: Markdown body without frontmatter
+
+    Returns:
+        {"wordCount": words, "readingTime": minutes (rounded up, 0 for an empty post)}
+    """
+    cjk_chars = 0
+    words = 0
+    fence = None
+    in_math = False
+
+    for line in content.splitlines():
+        if fence:
+            if line.strip().startswith(fence):
+                fence = None
+            continue
+        if in_math:
+            if "$$" in line:
+                in_math = False
+            continue
+
+        fence_match = _FENCE.match(line)
+        if fence_match:
+            fence = fence_match.group(1)
+            continue
+        if _MATH_BLOCK.match(line):
+            # 同一行闭合的 $$...$$ 不进入公式块状态 - A $$...$$ closed on the same line opens no block
+            in_math = line.count("$$") == 1
+            continue
+
+        for token in _TOKEN.finditer(_INLINE_SKIP.sub(" ", line)):
+            if token.group(1):
+                cjk_chars += 1
+            else:
+                words += 1
+
+    minutes = cjk_chars / CJK_CHARS_PER_MINUTE + words / WORDS_PER_MINUTE
+    return {
+        "wordCount": cjk_chars + words,
+        "readingTime": math.ceil(minutes),
+    }
@@ -0,0 +1,235 @@
+"""
+文章全文搜索服务 - Post full-text search service
+基于 SQLite FTS5 的倒排索引，覆盖标题、描述、标签和正文，由 post_service 的增删改增量维护
+SQLite FTS5 inverted index over title, description, tags and body,
+maintained incrementally by post_service create/update/delete
+"""
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import frontmatter
+from sqlalchemy import text
+
+from ..data.database import engine
+
+# 中日韩字符范围：假名、CJK统一表意文字（含扩展A）、兼容表意文字、韩文音节
+# CJK ranges: kana, CJK unified ideographs (incl. extension A), compatibility ideographs, hangul syllables
+_CJK_RUN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]+")
+_WORD = re.compile(r"\w+")
+
+
+def _cjk_bigrams(run: str) -> List[str]:
+    """Split a run of CJK characters into overlapping bigrams (a lone character stays as is)"""
+    if len(run) == 1:
+        return [run]
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def _cjk_tokens(run: str) -> List[str]:
+    """Bigrams of a run followed by its last character, so every character starts some token"""
+    bigrams = _cjk_bigrams(run)
+    return bigrams + [run[-1]] if len(run) > 1 else bigrams
+
+
+def tokenize(value: str) -> str:
+    """
+    CJK 感知的分词预处理 - CJK-aware tokenization pre-pass
+
+    unicode61 分词器会把连续的中文视为一个词，无法按子串搜索
+    这里把中文连续片段切分为重叠的二元组，其余文本原样交给 unicode61
+    unicode61 treats a run of Chinese characters as one token, so substrings can't be found.
+    CJK runs are split into overlapping bigrams; everything else is left to unicode61.
+    The run's last character is appended as a unigram so single-character queries
+    can match it as a prefix; it follows the bigrams, so bigram phrases stay contiguous.
+    """
+    return _CJK_RUN.sub(lambda m: " " + " ".join(_cjk_tokens(m.group())) + " ", value)
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    将用户输入转换为 FTS5 MATCH 表达式 - Turn user input into an FTS5 MATCH expression
+
+    Every term must match: CJK runs become phrases of consecutive bigrams,
+    a lone CJK character and other words become prefix queries.
+    Returns None if the query has no terms.
+    """
+    terms = []
+    for word in _WORD.findall(query):
+        pos = 0
+        for m in _CJK_RUN.finditer(word):
+            if m.start() > pos:
+                terms.append('"' + word[pos:m.start()] + '"*')
+            run = m.group()
+            if len(run) == 1:
+                # 单字匹配以它开头的二元组或末尾单字 - Matches bigrams starting with it or a trailing unigram
+                terms.append('"' + run + '"*')
+            else:
+                terms.append('"' + " ".join(_cjk_bigrams(run)) + '"')
+            pos = m.end()
+        if pos < len(word):
+            terms.append('"' + word[pos:] + '"*')
+    return " AND ".join(terms) if terms else None
+
+
+class PostSearchIndex:
+    """
+    文章全文搜索索引 - Post full-text search index
+
+    Rules:
+    - Lives in the existing database as an FTS5 table plus a (slug, mtime, size) state table
+    - create/update/delete call update()/remove() so the index never needs a rebuild
+    - The posts watcher calls refresh()/remove() for files changed outside the API
+    - sync() re-indexes only files whose mtime or size differ from the state table;
+      it runs once when the watcher starts, and per search only when there is no watcher
+    - Results are ranked with bm25, weighting title over tags/description over body
+    """
+
+    def __init__(self):
+        self.available = False
+        self._lock = threading.Lock()
+
+    def ensure_schema(self) -> None:
+        """Create the FTS5 and state tables if needed (called on startup)"""
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS post_search USING fts5("
+                    "slug UNINDEXED, title, description, tags, body, "
+                    "tokenize='unicode61 remove_diacritics 2')"
+                ))
+                conn.execute(text(
+                    "CREATE TABLE IF NOT EXISTS post_search_state ("
+                    "slug TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL)"
+                ))
+            self.available = True
+        except Exception as e:
+            print(f"Full-text search disabled (SQLite FTS5 unavailable): {e}")
+            self.available = False
+
+    def update(self, md_file: Path, metadata: Dict[str, Any], content: str) -> None:
+        """Index (or re-index) one post from its metadata and body"""
+        if not self.available:
+            return
+        slug = md_file.stem
+        stat_result = md_file.stat()
+        tags = metadata.get('tags') or []
+
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM post_search WHERE slug = :slug"), {"slug": slug})
+            conn.execute(
+                text(
+                    "INSERT INTO post_search (slug, title, description, tags, body) "
+                    "VALUES (:slug, :title, :description, :tags, :body)"
+                ),
+                {
+                    "slug": slug,
+                    "title": tokenize(str(metadata.get('title') or '')),
+                    "description": tokenize(str(metadata.get('description') or '')),
+                    "tags": tokenize(" ".join(str(tag) for tag in tags)),
+                    "body": tokenize(content),
+                },
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO post_search_state (slug, mtime_ns, size) VALUES (:slug, :mtime_ns, :size) "
+                    "ON CONFLICT(slug) DO UPDATE SET mtime_ns = excluded.mtime_ns, size = excluded.size"
+                ),
+                {"slug": slug, "mtime_ns": stat_result.st_mtime_ns, "size": stat_result.st_size},
+            )
+
+    def remove(self, slug: str) -> None:
+        """Drop one post from the index"""
+        if not self.available:
+            return
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM post_search WHERE slug = :slug"), {"slug": slug})
+            conn.execute(text("DELETE FROM post_search_state WHERE slug = :slug"), {"slug": slug})
+
+    def refresh(self, md_file: Path) -> None:
+        """Re-index one file if its mtime or size differ from the state table, or drop it if it is gone"""
+        if not self.available:
+            return
+        try:
+            stat_result = md_file.stat()
+        except FileNotFoundError:
+            self.remove(md_file.stem)
+            return
+
+        with engine.connect() as conn:
+            row = conn.execute(
+                text("SELECT mtime_ns, size FROM post_search_state WHERE slug = :slug"),
+                {"slug": md_file.stem},
+            ).first()
+        if row is not None and (row.mtime_ns, row.size) == (stat_result.st_mtime_ns, stat_result.st_size):
+            return
+        self._index_file(md_file)
+
+    def _index_file(self, md_file: Path) -> None:
+        try:
+            with open(md_file, 'r', encoding='utf-8') as f:
+                post = frontmatter.load(f)
+            self.update(md_file, post.metadata, post.content)
+        except Exception as e:
+            print(f"Error indexing file {md_file} for search: {e}")
+
+    def sync(self, posts_dir: Path) -> None:
+        """Re-index files changed outside the API, comparing mtime/size with the state table"""
+        if not self.available:
+            return
+
+        # 同一时刻只允许一个同步，避免重复解析 - One sync at a time to avoid duplicate parsing
+        with self._lock:
+            with engine.connect() as conn:
+                state = {
+                    row.slug: (row.mtime_ns, row.size)
+                    for row in conn.execute(text("SELECT slug, mtime_ns, size FROM post_search_state"))
+                }
+
+            seen = set()
+            if posts_dir.exists():
+                with os.scandir(posts_dir) as it:
+                    for dir_entry in it:
+                        if not dir_entry.name.endswith(".md") or not dir_entry.is_file():
+                            continue
+                        slug = dir_entry.name[:-3]
+                        seen.add(slug)
+                        stat_result = dir_entry.stat()
+                        if state.get(slug) == (stat_result.st_mtime_ns, stat_result.st_size):
+                            continue
+                        self._index_file(Path(dir_entry.path))
+
+            for slug in state.keys() - seen:
+                self.remove(slug)
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> Tuple[List[str], int]:
+        """
+        全文搜索 - Full-text search
+
+        Returns:
+            (matching slugs ordered by relevance, total number of matches)
+        """
+        match = build_match_query(query)
+        if not self.available or match is None:
+            return [], 0
+
+        with engine.connect() as conn:
+            total = conn.execute(
+                text("SELECT count(*) FROM post_search WHERE post_search MATCH :match"),
+                {"match": match},
+            ).scalar()
+            rows = conn.execute(
+                text(
+                    "SELECT slug FROM post_search WHERE post_search MATCH :match "
+                    "ORDER BY bm25(post_search, 0.0, 10.0, 4.0, 6.0, 1.0) "
+                    "LIMIT :limit OFFSET :offset"
+                ),
+                {"match": match, "limit": limit, "offset": offset},
+            )
+            return [row.slug for row in rows], total
+
+
+# Global post search index instance
+search_index = PostSearchIndex()
@@ -0,0 +1,50 @@
+"""
+Micro-benchmark: CORS origin matching
+Compares the legacy expanded origin list with the compiled OriginPolicy
+"""
+import sys
+import os
+import timeit
+sys.path.append(os.path.dirname(__file__))
+
+from app.core.config import settings
+from app.core.cors import OriginPolicy
+
+PORTS = range(settings.LOCAL_PORT_RANGE_START, settings.LOCAL_PORT_RANGE_END + 1)
+
+# 旧实现：逐个端口展开的来源列表 - Legacy: one literal origin per port
+LEGACY_ORIGINS = (
+    ["http://localhost:3000", "http://127.0.0.1:3000"] +
+    [f"http://localhost:{port}" for port in PORTS] +
+    [f"http://127.0.0.1:{port}" for port in PORTS]
+)
+
+POLICY = OriginPolicy([
+    "http://localhost:3000",
+    "http://127.0.0.1:3000",
+    f"http://localhost:{PORTS.start}-{PORTS.stop - 1}",
+    f"http://127.0.0.1:{PORTS.start}-{PORTS.stop - 1}",
+])
+
+CASES = {
+    "first entry": "http://localhost:3000",
+    "last entry": f"http://127.0.0.1:{PORTS.stop - 1}",
+    "rejected": "https://evil.example.com",
+}
+
+
+def bench_cors(number: int = 20000):
+    """Time both matchers on a hit at the start, a hit at the end and a miss"""
+    print(f"=== CORS origin matching ({len(LEGACY_ORIGINS)} legacy entries, {number} checks each) ===")
+    for name, origin in CASES.items():
+        assert (origin in LEGACY_ORIGINS) == POLICY.is_allowed(origin), origin
+        legacy = timeit.timeit(lambda: origin in LEGACY_ORIGINS, number=number)
+        policy = timeit.timeit(lambda: POLICY.is_allowed(origin), number=number)
+        print(
+            f"  {name:<12} list: {legacy / number * 1e9:8.0f} ns/check   "
+            f"policy: {policy / number * 1e9:8.0f} ns/check"
+        )
+
+
+if __name__ == "__main__":
+    bench_cors()
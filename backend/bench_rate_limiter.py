@@ -0,0 +1,45 @@
+"""
+Micro-benchmark: login rate limiter backends
+Compares per-check latency of the in-memory and SQLite-backed rate limiters
+"""
+import sys
+import os
+import tempfile
+import timeit
+sys.path.append(os.path.dirname(__file__))
+
+# 使用临时数据库，避免写入真实数据 - Use a throwaway database so real data is untouched
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/bench.db"
+
+from app.data import models  # noqa: F401  (registers the login_attempts table)
+from app.data.database import create_tables, engine
+from app.core.rate_limiter import RateLimiter, SQLiteRateLimiter
+
+create_tables()
+
+BACKENDS = {
+    "memory": RateLimiter(),
+    "sqlite": SQLiteRateLimiter(engine),
+}
+
+
+def bench_rate_limiter(number: int = 5000):
+    """Time a lock check on a known and an unknown user, and a failed-attempt upsert"""
+    print(f"=== Login rate limiter ({number} calls each) ===")
+    for name, limiter in BACKENDS.items():
+        limiter.record_failed_attempt("admin")
+        counter = iter(range(10 ** 9))
+
+        check_known = timeit.timeit(lambda: limiter.is_locked("admin"), number=number)
+        check_unknown = timeit.timeit(lambda: limiter.is_locked("nobody"), number=number)
+        record = timeit.timeit(lambda: limiter.record_failed_attempt(f"spray-{next(counter)}"), number=number)
+        print(
+            f"  {name:<7} is_locked(known): {check_known / number * 1e6:8.1f} us   "
+            f"is_locked(unknown): {check_unknown / number * 1e6:8.1f} us   "
+            f"record_failed_attempt: {record / number * 1e6:8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    bench_rate_limiter()
@@ -0,0 +1,55 @@
+"""
+Build scheduler test: a build still pending at shutdown must run after the next start
+"""
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(__file__))
+
+from app.services import build_service
+from app.services.build_service import (
+    BUILD_FAILED,
+    BUILD_SUCCEEDED,
+    BuildManifest,
+    BuildResult,
+    BuildScheduler,
+)
+
+
+def test_build_pending_at_shutdown_resumes_on_start(tmp_path, monkeypatch):
+    """Stopping inside the debounce window cancels the build, but the next scheduler picks it up"""
+    posts_dir = tmp_path / "posts"
+    posts_dir.mkdir()
+    (posts_dir / "hello.md").write_text("---\ntitle: Hello\n---\nbody\n", encoding="utf-8")
+    manifest_path = tmp_path / "build_manifest.json"
+
+    builds = []
+    monkeypatch.setattr(
+        build_service, "trigger_astro_rebuild",
+        lambda: builds.append(time.monotonic()) or BuildResult(success=True, exit_code=0),
+    )
+
+    # 静默窗口内关机 - Shut down inside the quiet window
+    scheduler = BuildScheduler(debounce_seconds=60, manifest=BuildManifest(manifest_path, posts_dir))
+    cancelled = scheduler.schedule("update", ["hello"])
+    scheduler.stop(timeout=5)
+
+    assert cancelled.status == BUILD_FAILED
+    assert builds == []
+
+    # 重启后从清单恢复 - Resume from the manifest after a restart
+    manifest = BuildManifest(manifest_path, posts_dir)
+    assert manifest.pending_slugs() == ["hello"]
+    restarted = BuildScheduler(debounce_seconds=0, manifest=manifest)
+    resumed = restarted.resume()
+    assert resumed is not None and resumed.slugs == ["hello"]
+
+    deadline = time.monotonic() + 5
+    while resumed.status != BUILD_SUCCEEDED and time.monotonic() < deadline:
+        time.sleep(0.01)
+    restarted.stop(timeout=5)
+
+    assert resumed.status == BUILD_SUCCEEDED
+    assert len(builds) == 1
+    assert manifest.pending_slugs() == []
+    assert restarted.resume() is None
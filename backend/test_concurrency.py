@@ -0,0 +1,58 @@
+"""
+Concurrency test: a slow login must not stall post listing
+"""
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(__file__))
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from app.main import app
+from app.api import auth
+from app.core.rate_limiter import RateLimiter
+from app.core.security import get_current_user
+
+SLOW_LOGIN_SECONDS = 1.0
+
+
+def test_slow_login_does_not_block_listing(monkeypatch):
+    """A login stuck in bcrypt for a second must not delay GET /api/admin/posts"""
+
+    def slow_authenticate_user(db, username, password):
+        # 模拟耗时的 bcrypt 校验 - Simulate an expensive bcrypt verification
+        time.sleep(SLOW_LOGIN_SECONDS)
+        return None
+
+    monkeypatch.setattr(auth, "authenticate_user", slow_authenticate_user)
+    # 内存限流器，测试不写入数据库 - In-memory limiter so the test doesn't write to the database
+    monkeypatch.setattr(auth, "rate_limiter", RateLimiter())
+    app.dependency_overrides[get_current_user] = lambda: None
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            started = time.perf_counter()
+            login = asyncio.create_task(client.post(
+                "/token", data={"username": "concurrency-test", "password": "wrong"}
+            ))
+            # 让登录请求先进入处理函数 - Let the login request reach its handler first
+            await asyncio.sleep(0.1)
+
+            listing = await client.get("/api/admin/posts")
+            listing_elapsed = time.perf_counter() - started
+
+            login_response = await login
+            return listing, listing_elapsed, login_response
+
+    try:
+        listing, listing_elapsed, login_response = asyncio.run(run())
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    assert listing.status_code == 200
+    assert login_response.status_code == 401
+    assert listing_elapsed < SLOW_LOGIN_SECONDS / 2
@@ -24,6 +24,7 @@ const posts = defineCollection({
     readingMetadata: z
       .object({
         wordCount: z.number(),
+        readingTime: z.number().optional(),// 预计阅读分钟数，由后端写入
       })
       .optional(),
   }),
@@ -91,6 +91,16 @@ class ApiClient {
     });
   }
 
+  /**
+   * PATCH request
+   */
+  async patch<T = any>(endpoint: string, data?: any): Promise<T> {
+    return this.request<T>(endpoint, {
+      method: 'PATCH',
+      body: JSON.stringify(data),
+    });
+  }
+
   /**
    * DELETE request
    */
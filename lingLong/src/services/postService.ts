@@ -21,6 +21,7 @@ export interface PostMetadata {
   sourceLink?: string;
   licenseName?: string;
   licenseUrl?: string;
+  readingMetadata?: { wordCount: number; readingTime?: number };
 }
 
 // Full post interface - includes content
@@ -93,6 +94,13 @@ class PostService {
     return apiClient.put<ApiResponse>(`${this.apiPrefix}/posts/${slug}`, postData);
   }
 
+  /**
+   * Apply partial updates to many posts at once (one rebuild for the whole batch)
+   */
+  async batchUpdatePosts(operations: Array<PostUpdate & { slug: string }>): Promise<ApiResponse> {
+    return apiClient.patch<ApiResponse>(`${this.apiPrefix}/posts`, { operations });
+  }
+
   /**
    * Delete post
    */
@@ -119,17 +127,12 @@ class PostService {
   }
 
   /**
-   * Search posts by title or tags
+   * Full-text search over title, description, tags and content (drafts included)
+   * Results are ordered by relevance
    */
-  async searchPosts(query: string): Promise<PostMetadata[]> {
-    const posts = await this.getAllPosts();
-    const searchTerm = query.toLowerCase();
-
-    return posts.filter(post =>
-      post.title.toLowerCase().includes(searchTerm) ||
-      post.tags?.some(tag => tag.toLowerCase().includes(searchTerm)) ||
-      post.description?.toLowerCase().includes(searchTerm)
-    );
+  async searchPosts(query: string, limit = 20, offset = 0): Promise<PostMetadata[]> {
+    const params = new URLSearchParams({ q: query, limit: String(limit), offset: String(offset) });
+    return apiClient.get<PostMetadata[]>(`${this.apiPrefix}/posts/search?${params}`);
   }
 }
 
@@ -80,7 +80,7 @@ export interface postCard {
   tags?: string[];
   description?: string;
   image?: string;
-  readingMetadata?: { wordCount: number };
+  readingMetadata?: { wordCount: number; readingTime?: number };
 }
 
 /**
@@ -133,11 +133,10 @@ export async function GetSortedPosts() {
     return dateA > dateB ? -1 : 1;
   });
 
-  // 计算字数并注入到 data 中
+  // 计算字数并注入到 data 中（后端已写入时直接使用，保留 readingTime）
   for (const post of sorted) {
-    const wordCount = countWords(post.body ||'');
-    (post.data as any).readingMetadata = {
-      wordCount: wordCount,
+    (post.data as any).readingMetadata = post.data.readingMetadata ?? {
+      wordCount: countWords(post.body || ''),
     };
   }
 
@@ -310,8 +309,10 @@ export async function getSecondCategories() {
       });
     }
 
-    // 计算字数
-    const wordCount = countWords(post.body || '');
+    // 计算字数（后端已写入时直接使用，保留 readingTime）
+    const readingMetadata = post.data.readingMetadata ?? {
+      wordCount: countWords(post.body || ''),
+    };
 
     // 对象下的 posts 数组内部的值
     categories.get(categorySlug)!.posts.push({
@@ -319,9 +320,7 @@ export async function getSecondCategories() {
       id: post.id, // 传递原始文档ID，让postCard组件自己处理URL生成
       published: new Date(post.data.published),
       tags: post.data.tags,
-      readingMetadata: {
-        wordCount: wordCount,
-      },
+      readingMetadata: readingMetadata,
       description:post.data.description,
       image:post.data.cover,
       // 传递分类信息给postCard组件显示